@@ -6,13 +6,18 @@ Features:
   ✅ Validates passwords against policy & dictionary
   ✅ Saves hashed passwords locally
   ✅ Shows last 3 hashes (--show-hashes)
+  ✅ Audits username:password files in parallel (--batch)
+  ✅ Machine-readable single checks for scripts and hooks (--quiet)
+
+Startup cost dominates when scripts call the CLI many times, so colorama, the
+hash store and the hashing backends are imported only by the paths using them.
 """
 
-import os, sys, io, argparse, getpass, logging
-from colorama import Fore, Style, init
-from pw_core import load_wordlist, validate_policy, check_strength, hash_password
+import os, sys, argparse, getpass, logging, json, time, itertools
+from pw_core import (load_wordlist, check_policy, check_strength, hash_password, as_matcher, leet_index,
+                     HashExecutor, load_hash_config, hash_config, score_batch)
+import pw_metrics
 
-init(autoreset=True)
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger("pw_cli")
 
@@ -22,7 +27,14 @@ MAX_HASH_LINES_SHOW = 500
 # ==============================
 # Score Table (printed at start)
 # ==============================
-POLICY_TABLE = f"""
+def _colors():
+    """colorama's Fore and Style, initialised on first use."""
+    from colorama import Fore, Style, init
+    init(autoreset=True)
+    return Fore, Style
+
+def policy_table(Fore, Style) -> str:
+    return f"""
 {Fore.CYAN}=== PASSWORD STRENGTH SCORE TABLE ==={Style.RESET_ALL}
 Each satisfied criterion adds points (max = 6)
 
@@ -43,25 +55,21 @@ Each satisfied criterion adds points (max = 6)
 # ==============================
 def read_last_hash_entries(path: str, count: int = 3):
     """Return last `count` lines of hash file."""
+    import sqlite3
+    from pw_hashstore import get_index, tail_lines
     try:
         if not os.path.isfile(path):
             return "(file not found)", 0
-        with open(path, "rb") as fh:
-            fh.seek(0, os.SEEK_END)
-            size = fh.tell()
-            data = bytearray()
-            lines_found = 0
-            pos = size - 1
-            while pos >= 0 and lines_found < count:
-                fh.seek(pos)
-                byte = fh.read(1)
-                if byte == b"\n":
-                    lines_found += 1
-                data.extend(byte)
-                pos -= 1
-            data.reverse()
-            text = data.decode("utf-8", errors="replace").strip()
-            return text, min(lines_found, count)
+        lines = None
+        try:
+            index = get_index(path, create=False)  # a read never creates a sidecar
+            if index is not None:
+                lines = index.tail(count)
+        except (sqlite3.Error, OSError) as e:  # e.g. read-only directory
+            log.warning("Hash index unavailable (%s); scanning file tail", e)
+        if lines is None:
+            lines = tail_lines(path, count)
+        return "\n".join(lines).strip(), len(lines)
     except Exception as e:
         log.exception("Error reading hash file: %s", e)
         return f"(error reading {path}: {e})", 0
@@ -70,13 +78,102 @@ def read_last_hash_entries(path: str, count: int = 3):
 # Helper: append new hash
 # ==============================
 def append_hash(path, entry):
-    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
-    with open(path, "a", encoding="utf-8") as f:
-        f.write(entry)
+    from pw_hashstore import append_lines
+    with pw_metrics.stage("hash_write"):
+        append_lines(path, [entry], fsync=True)
+
+# ==============================
+# Batch mode: username:password records -> JSONL
+# ==============================
+BATCH_CHUNK_PER_WORKER = 512
+_BATCH = {}
+
+def _open_breach(path):
+    if not path:
+        return None
+    from pw_breach import open_breach_dump
+    return open_breach_dump(path)
+
+def _open_fuzzy(wordset, max_distance, min_len, index_file):
+    # A prebuilt .pwfz wins; otherwise build one for the loaded wordlist
+    if not (index_file or max_distance):
+        return None
+    from pw_fuzzy import FuzzyIndex, fuzzy_index
+    if index_file:
+        return FuzzyIndex.load(index_file)
+    return fuzzy_index(wordset, max_distance, min_len)
+
+def _init_batch_worker(wordlist, max_lines, min_dict_len, exact_only, leet=False, breach_dump=None, fuzzy=(0, 0, None)):
+    # With fork the parent's dictionary is inherited copy-on-write; only
+    # spawn-based platforms load it again per worker.
+    if "wordset" not in _BATCH:
+        _BATCH["wordset"] = as_matcher(load_wordlist(wordlist, max_lines=max_lines) if wordlist else set())
+    _BATCH["min_dict_len"] = min_dict_len
+    _BATCH["exact_only"] = exact_only
+    _BATCH["leet"] = leet
+    if "breach" not in _BATCH:
+        _BATCH["breach"] = _open_breach(breach_dump)
+    if "fuzzy" not in _BATCH:
+        _BATCH["fuzzy"] = _open_fuzzy(_BATCH["wordset"], *fuzzy)
+    if leet and _BATCH["wordset"]:
+        leet_index(_BATCH["wordset"])
+
+def _parse_record(lineno, line):
+    username, sep, password = line.rstrip("\r\n").partition(":")
+    if not sep:
+        username, password = "", username
+    return lineno, username.strip(), password.strip()
+
+def _check_record(record):
+    lineno, username, password = record
+    rule, msg = check_policy(password, username, _BATCH["wordset"], _BATCH["min_dict_len"], _BATCH["exact_only"],
+                             leet=_BATCH["leet"], breach=_BATCH["breach"], fuzzy=_BATCH["fuzzy"])
+    return {"line": lineno, "username": username, "accepted": rule is None, "message": msg}
+
+def run_batch(args):
+    """Stream records from args.batch and write one JSON result per line, in input order."""
+    src = sys.stdin if args.batch == "-" else open(args.batch, "r", encoding="utf-8", errors="replace")
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    workers = max(1, args.workers)
+    _BATCH.clear()
+    fuzzy = (args.fuzzy, args.fuzzy_min_len, args.fuzzy_index)
+    _init_batch_worker(args.wordlist, args.max_lines, args.min_dict_len, args.exact_only, args.leet, args.breach_dump, fuzzy)
+    log.info("Loaded %s wordlist entries; checking with %d worker(s)", f"{len(_BATCH['wordset']):,}", workers)
+
+    records = (_parse_record(i, ln) for i, ln in enumerate(src, 1) if ln.strip())
+    total = accepted = 0
+    started = time.perf_counter()
+    pool = None
     try:
-        os.chmod(path, 0o600)
-    except Exception:
-        pass
+        if workers > 1:
+            import multiprocessing
+            pool = multiprocessing.Pool(workers, initializer=_init_batch_worker,
+                                        initargs=(args.wordlist, args.max_lines, args.min_dict_len, args.exact_only,
+                                                  args.leet, args.breach_dump, fuzzy))
+        # Bounded chunks keep memory constant regardless of input size.
+        while True:
+            chunk = list(itertools.islice(records, workers * BATCH_CHUNK_PER_WORKER))
+            if not chunk:
+                break
+            # Scores for the whole chunk in one vectorized pass; policy checks run on the workers
+            scores, _ = score_batch(password for _, _, password in chunk)
+            results = pool.imap(_check_record, chunk, chunksize=64) if pool else map(_check_record, chunk)
+            for res, score in zip(results, scores):
+                res["score"] = score
+                out.write(json.dumps(res) + "\n")
+                total += 1
+                accepted += res["accepted"]
+        out.flush()
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        if src is not sys.stdin:
+            src.close()
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - started
+    log.info("Checked %s records (%s accepted) in %.2fs", f"{total:,}", f"{accepted:,}", elapsed)
 
 # ==============================
 # Argument parsing
@@ -87,7 +184,27 @@ def parse_args():
     ap.add_argument("--max-lines", "-m", type=int, default=200000, help="Max lines to load from wordlist")
     ap.add_argument("--min-dict-len", type=int, default=4, help="Min dictionary word length")
     ap.add_argument("--hash-file", default="./password_hashes.txt", help="File to store or read hashes")
+    ap.add_argument("--hash-config", metavar="FILE",
+                    help="Hashing cost parameters from pw_calibrate.py (default: $PW_HASH_CONFIG or ./pw_hash_params.json)")
     ap.add_argument("--show-hashes", action="store_true", help="Show last 3 saved hashes and exit")
+    ap.add_argument("--exact-only", action="store_true", help="Only exact dictionary matches; disable substring checks")
+    ap.add_argument("--leet", action="store_true", help="Also match leetspeak variants of dictionary words (P@ssw0rd)")
+    ap.add_argument("--fuzzy", type=int, default=0, metavar="K",
+                    help="Also reject near-misses within K edits of a dictionary word (0 = off; 1 recommended)")
+    ap.add_argument("--fuzzy-min-len", type=int, default=6, help="Shortest dictionary word matched fuzzily")
+    ap.add_argument("--fuzzy-index", metavar="FILE", help="Prebuilt .pwfz fuzzy index (see pw_fuzzy.py); implies --fuzzy")
+    ap.add_argument("--breach-dump", metavar="FILE",
+                    help="Reject passwords found in a sorted SHA-1/NTLM HASH:COUNT dump (see pw_breach.py)")
+    ap.add_argument("--batch", metavar="FILE|-", help="Audit username:password records from FILE (or stdin) and write JSONL")
+    ap.add_argument("--output", "-o", default="-", help="Batch results file (default stdout)")
+    ap.add_argument("--workers", "-j", type=int, default=os.cpu_count() or 1, help="Worker processes for --batch")
+    ap.add_argument("--history-depth", type=int, default=0,
+                    help="Reject a password matching any of the user's last N hashes in --hash-file (0 = off)")
+    ap.add_argument("--quiet", "-q", action="store_true",
+                    help="Machine output: no banner or prompts; a check reads username and password from stdin "
+                         "and prints one JSON line (exit 1 if rejected)")
+    ap.add_argument("--timings", action="store_true",
+                    help="Print per-stage timings to stderr on exit (batch stages are only seen with --workers 1)")
     return ap.parse_args()
 
 # ==============================
@@ -95,9 +212,72 @@ def parse_args():
 # ==============================
 def main():
     args = parse_args()
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+    if args.timings:
+        pw_metrics.enable()
+    load_hash_config(args.hash_config)
+    try:
+        # A configured breach dump must be usable; never silently skip breach checks
+        dump = _open_breach(args.breach_dump)
+    except (OSError, ValueError) as e:
+        log.error("Cannot open breach dump %s: %s", args.breach_dump, e)
+        return 2
+    if dump:
+        dump.close()
+    try:
+        return run(args)
+    finally:
+        if args.timings:
+            print("\n=== Timings ===\n" + pw_metrics.summary(), file=sys.stderr)
+
+def evaluate(args, username, password, wordset):
+    """Run the policy check (plus the optional history check); return (rule, message)."""
+    # Password history: verify the user's last N hashes in parallel
+    history, executor = None, None
+    if args.history_depth and username and os.path.isfile(args.hash_file):
+        from pw_hashstore import get_index
+        history = get_index(args.hash_file).entries_for(username, args.history_depth)
+        # One verify per entry, but no more at once than the configured hash workers
+        workers = min(len(history), hash_config()["hash_workers"] or os.cpu_count() or 1)
+        executor = HashExecutor(workers=max(1, workers), queue_depth=len(history), timeout=None)
+    try:
+        return check_policy(password, username, wordset, args.min_dict_len, args.exact_only, history, executor,
+                            args.leet, _open_breach(args.breach_dump),
+                            _open_fuzzy(wordset, args.fuzzy, args.fuzzy_min_len, args.fuzzy_index))
+    finally:
+        if executor:
+            executor.shutdown(wait=False)
+
+def run_quiet(args):
+    """--quiet: bare hash lines, or one JSON verdict per call; exit status 1 if rejected."""
+    if args.show_hashes:
+        preview, shown = read_last_hash_entries(args.hash_file, count=3)
+        if shown:
+            print(preview)
+        return 0
+
+    username = sys.stdin.readline().strip()
+    password = (getpass.getpass("") if sys.stdin.isatty() else sys.stdin.readline()).strip()
+    wordset = as_matcher(load_wordlist(args.wordlist, max_lines=args.max_lines) if args.wordlist else set())
+    rule, msg = evaluate(args, username, password, wordset)
+    if rule is None:
+        append_hash(args.hash_file, f"{username}:{hash_password(password)}\n")
+    print(json.dumps({"username": username, "accepted": rule is None, "rule": rule, "message": msg,
+                      "score": check_strength(password), "hash_file": args.hash_file if rule is None else None}))
+    return 0 if rule is None else 1
+
+def run(args):
+    # Batch mode writes machine-readable output only
+    if args.batch:
+        run_batch(args)
+        return 0
+    if args.quiet:
+        return run_quiet(args)
 
     # Always print score table at start
-    print(POLICY_TABLE)
+    Fore, Style = _colors()
+    print(policy_table(Fore, Style))
     print(Fore.CYAN + f"PW Enforcer CLI {VERSION}" + Style.RESET_ALL)
 
     # Option 1: show hashes
@@ -105,7 +285,7 @@ def main():
         preview, shown = read_last_hash_entries(args.hash_file, count=3)
         print(Fore.CYAN + f"\n=== Last {shown} entries in {args.hash_file} ===" + Style.RESET_ALL)
         print(preview)
-        return
+        return 0
 
     # Option 2: check password
     print(Fore.CYAN + "\n=== Password Policy Check ===" + Style.RESET_ALL)
@@ -113,22 +293,22 @@ def main():
     password = getpass.getpass("Enter password: ").strip()
 
     # Load dictionary
-    wordset = load_wordlist(args.wordlist, max_lines=args.max_lines) if args.wordlist else set()
+    wordset = as_matcher(load_wordlist(args.wordlist, max_lines=args.max_lines) if args.wordlist else set())
     print(Fore.GREEN + f"[+] Loaded {len(wordset):,} wordlist entries" + Style.RESET_ALL)
 
     # Evaluate
-    ok, msg = validate_policy(password, username, wordset, args.min_dict_len)
+    rule, msg = evaluate(args, username, password, wordset)
     score = check_strength(password)
     print(Fore.CYAN + f"Score: {score}/6" + Style.RESET_ALL)
 
-    if ok:
+    if rule is None:
         print(Fore.GREEN + "[✓] " + msg + Style.RESET_ALL)
         append_hash(args.hash_file, f"{username}:{hash_password(password)}\n")
         print(Fore.YELLOW + f"Hash saved to {args.hash_file}" + Style.RESET_ALL)
     else:
         print(Fore.RED + "[✗] " + msg + Style.RESET_ALL)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
-
+    sys.exit(main())
@@ -13,22 +13,43 @@ import threading
 import time
 import webbrowser
 import html
-from flask import Flask, request, render_template_string, redirect, url_for
-from werkzeug.utils import secure_filename
+import sqlite3
+from collections import deque
+from flask import Flask, request, render_template_string, redirect, url_for, jsonify, g, Response
 
 # Local core helpers (adjust import if your core file name differs)
-from pw_core import normalize_text, validate_policy, check_strength, load_wordlist, hash_password
+from pw_core import normalize_text, validate_policy, check_policy, check_strength, load_wordlist, as_matcher, leet_index, HashExecutor, HashBusy, load_hash_config, score_batch
+from pw_wordlist import WordlistCache, WordlistWatcher, UploadStore, shared_wordlist as open_shared_wordlist
+from pw_hashstore import get_writer, get_index, head_lines, FSYNC_POLICIES
+from pw_breach import open_breach_dump
+from pw_fuzzy import FuzzyIndex, fuzzy_index
+import pw_metrics
 
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger("pw_web")
 
 VERSION = "v1.0.0"
 UPLOAD_DIR = "uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 # safety limit when showing hash file
 MAX_HASH_LINES_SHOW = 500
 
+BUSY_MESSAGE = "Server is busy hashing other passwords; nothing was saved. Try again shortly."
+WORDLIST_ERROR = "Wordlist not found or unreadable; nothing was checked or saved."
+
+# max {username, password} items per /api/v1/check request
+API_MAX_ITEMS = 10_000
+# hash executor slots one /api/v1/check request may hold at once, so a large
+# batch cannot starve interactive checks
+API_HASH_SLOTS = 2
+
+# process-wide cache for wordlists passed per request (path or upload)
+WORDLIST_CACHE = WordlistCache()
+WORDLIST_CACHE_COUNTERS = ("hits", "misses", "coalesced", "evictions")
+
+# uploaded wordlists, stored once per distinct content
+UPLOADS = UploadStore(UPLOAD_DIR)
+
 TEMPLATE = r"""<!doctype html>
 <html lang="en">
 <head>
@@ -97,7 +118,7 @@ input[type=text],input[type=password],input[type=number],input[type=file]{width:
           <hr>
 
           <label>Upload a wordlist (optional, used for this check)</label>
-          <input type="file" name="wordlist_file" accept=".txt">
+          <input type="file" name="wordlist_file" accept=".txt,.gz,.xz,.bz2,.zst">
 
           <label>Or wordlist path (optional)</label>
           <input type="text" name="wordlist_path" value="{{wordlist_path}}">
@@ -116,6 +137,9 @@ input[type=text],input[type=password],input[type=number],input[type=file]{width:
           <label class="small" style="margin-top:8px">
             <input type="checkbox" name="exact_only" {% if exact_only %}checked{% endif %}> Exact match only (disable substring checks)
           </label>
+          <label class="small">
+            <input type="checkbox" name="leet" {% if leet %}checked{% endif %}> Match leetspeak variants (P@ssw0rd)
+          </label>
 
           <label>Hash file (local)</label>
           <input type="text" name="hash_file" value="{{hash_file}}">
@@ -235,49 +259,163 @@ document.addEventListener('DOMContentLoaded', function(){
 </html>
 """
 
-def _save_uploaded_file(file_storage):
-    """Save uploaded file and return path (or None)."""
+def _save_uploaded_file(file_storage, store=UPLOADS):
+    """Store an upload by content digest and return its path (or None).
+
+    The path is pinned against eviction; the request releases it on teardown.
+    A later upload of the same content reuses the cached wordset for it.
+    """
     if not file_storage or file_storage.filename == "":
         return None
-    filename = secure_filename(file_storage.filename)
-    dest = os.path.join(UPLOAD_DIR, filename)
-    file_storage.save(dest)
-    return dest
+    with pw_metrics.stage("upload"):
+        path = store.save(file_storage.stream)
+    g.setdefault("pinned_uploads", []).append(path)
+    return path
 
 def _read_hash_file_preview(path, max_lines=MAX_HASH_LINES_SHOW):
     """Return an escaped preview (first max_lines lines) and actual lines read."""
     try:
         if not os.path.isfile(path):
             return "(file not found)", 0
-        lines = []
-        with open(path, "r", encoding="utf-8", errors="replace") as fh:
-            for i, ln in enumerate(fh):
-                if i >= max_lines:
-                    break
-                lines.append(ln.rstrip("\n"))
+        lines = None
+        try:
+            index = get_index(path, create=False)  # a read never creates a sidecar
+            if index is not None:
+                lines = index.page(0, max_lines)
+                truncated = index.count() > max_lines
+        except (sqlite3.Error, OSError) as e:
+            log.warning("Hash index unavailable (%s); scanning file head", e)
+        if lines is None:
+            lines, truncated = head_lines(path, max_lines)
         escaped = html.escape("\n".join(lines))
-        total_read = len(lines)
         # If file had more lines than max_lines, indicate truncation
-        with open(path, "r", encoding="utf-8", errors="replace") as fh:
-            # check quickly whether there are more lines
-            for _ in range(max_lines):
-                _ = fh.readline()
-            rest = fh.readline()
-            if rest:
-                escaped += html.escape("\n\n... (truncated)\n")
-        return escaped, total_read
+        if truncated:
+            escaped += html.escape("\n\n... (truncated)\n")
+        return escaped, len(lines)
     except Exception as e:
         log.exception("Failed reading hash file: %s", e)
         return f"(error reading file: {e})", 0
 
-def create_app(default_wordlist=None, max_lines=200000, min_dict_len=4, exact_only=False, hash_file="./password_hashes.txt"):
+def _append_hash_lines(path, lines, fsync="commit"):
+    """Append `username:hash` lines through the shared group-commit writer; returns success."""
+    try:
+        with pw_metrics.stage("hash_write"):
+            get_writer(path, fsync).append(lines)
+        return True
+    except Exception as e:
+        log.exception("Failed writing hash: %s", e)
+        return False
+
+def create_app(default_wordlist=None, max_lines=200000, min_dict_len=4, exact_only=False, hash_file="./password_hashes.txt",
+               wordlist_cache_mb=None, hash_workers=None, hash_queue=8, hash_timeout=5.0, metrics=False,
+               hash_fsync="commit", history_depth=0, leet=False, reload_interval=0,
+               shared_wordlist=False, shared_dir=None, upload_max_mb=None, breach_dump=None,
+               fuzzy=0, fuzzy_min_len=6, fuzzy_file=None, hash_config=None):
+    """Build the Flask app; also usable as a factory by multi-process servers.
+
+    With `shared_wordlist`, the default wordlist is compiled once into
+    `shared_dir` and every worker process mmaps the same file. Hashing cost
+    parameters (and the default `hash_workers`) come from `hash_config`, as
+    written by pw_calibrate.py.
+    """
     app = Flask(__name__)
-    app.config["WORDSET"] = load_wordlist(default_wordlist, max_lines) if default_wordlist else set()
+    if metrics:
+        pw_metrics.enable()
+    if wordlist_cache_mb is not None:
+        WORDLIST_CACHE.max_bytes = wordlist_cache_mb * 1024 * 1024
+    app.config["WORDLIST_CACHE"] = WORDLIST_CACHE
+    if upload_max_mb is not None:
+        UPLOADS.max_bytes = upload_max_mb * 1024 * 1024
+    app.config["UPLOADS"] = UPLOADS
+    if shared_wordlist:
+        loader = lambda path, max_lines: (open_shared_wordlist(path, max_lines, shared_dir) if os.path.isfile(path)
+                                          else as_matcher(load_wordlist(path, max_lines)))
+    else:
+        loader = lambda path, max_lines: as_matcher(load_wordlist(path, max_lines))
+    # Read by _swap, which may run as soon as the watcher starts
+    app.config["LEET"] = leet
+    app.config["FUZZY"] = (fuzzy, fuzzy_min_len) if fuzzy else None
+    app.config["FUZZY_FILE"] = FuzzyIndex.load(fuzzy_file) if fuzzy_file else None
+    app.config["BREACH"] = open_breach_dump(breach_dump)
+
+    def _default_fuzzy():
+        # A prebuilt index file sets the default wordlist's fuzzy parameters
+        prebuilt = app.config["FUZZY_FILE"]
+        return (prebuilt.k, prebuilt.min_len) if prebuilt is not None else app.config["FUZZY"]
+
+    app.config["WORDLIST_WATCHER"] = None
+    if default_wordlist and reload_interval > 0 and os.path.isfile(default_wordlist):
+        def _swap(wordset):
+            # Requests already running keep the wordset they looked up. Derived indexes
+            # are built before the swap; after an append they only cover the new words.
+            if app.config["LEET"]:
+                leet_index(wordset)
+            if _default_fuzzy():
+                fuzzy_index(wordset, *_default_fuzzy())
+            app.config["WORDSET"] = wordset
+        watcher = WordlistWatcher(default_wordlist, max_lines, reload_interval, on_change=_swap, loader=loader)
+        app.config["WORDSET"] = watcher.start().wordset
+        app.config["WORDLIST_WATCHER"] = watcher
+    else:
+        app.config["WORDSET"] = loader(default_wordlist, max_lines) if default_wordlist else as_matcher(set())
     app.config["WORDLIST_PATH"] = default_wordlist or ""
     app.config["MAX_LINES"] = max_lines
     app.config["MIN_DICT_LEN"] = min_dict_len
     app.config["EXACT_ONLY"] = exact_only
+    if _default_fuzzy():
+        # build (or adopt the prebuilt file) up front, not on the first request
+        fuzzy_index(app.config["WORDSET"], *_default_fuzzy(), prebuilt=app.config["FUZZY_FILE"])
     app.config["HASH_FILE"] = hash_file
+    params = load_hash_config(hash_config)
+    if params["path"]:
+        log.info("Hashing with %s from %s", params["argon2"], params["path"])
+    hash_workers = hash_workers or params["hash_workers"] or 2
+    app.config["HASH_PARAMS"] = params
+    app.config["HASH_EXECUTOR"] = HashExecutor(hash_workers, hash_queue, hash_timeout)
+    app.config["HASH_FSYNC"] = hash_fsync
+    app.config["HISTORY_DEPTH"] = history_depth
+    if leet and app.config["WORDSET"]:
+        leet_index(app.config["WORDSET"])  # fold the default list up front, not on the first request
+
+    def _wordset_for(path, max_lines):
+        # The form echoes the default wordlist path back; reuse the preloaded set for it
+        if not path or (path == app.config["WORDLIST_PATH"] and max_lines == app.config["MAX_LINES"]):
+            return app.config["WORDSET"]
+        return app.config["WORDLIST_CACHE"].get(path, max_lines)
+
+    def _fuzzy_for(wordset):
+        if wordset is app.config["WORDSET"]:
+            return fuzzy_index(wordset, *_default_fuzzy()) if _default_fuzzy() else None
+        return fuzzy_index(wordset, *app.config["FUZZY"]) if app.config["FUZZY"] else None
+
+    def _history_for(hash_file, username):
+        # The user's last N stored hashes, for the password-reuse check
+        depth = app.config["HISTORY_DEPTH"]
+        if not depth or not username or not os.path.isfile(hash_file):
+            return None
+        try:
+            return get_index(hash_file).entries_for(username, depth)
+        except Exception as e:
+            log.exception("Failed reading password history: %s", e)
+            return None
+
+    @app.before_request
+    def _start_timer():
+        if pw_metrics.enabled:
+            g.request_t0 = time.perf_counter()
+
+    @app.teardown_request
+    def _release_uploads(exc):
+        for path in g.pop("pinned_uploads", ()):
+            app.config["UPLOADS"].release(path)
+
+    @app.after_request
+    def _record_request(response):
+        t0 = g.pop("request_t0", None)
+        if t0 is not None and request.endpoint:
+            pw_metrics.observe(f"http_{request.endpoint}", time.perf_counter() - t0)
+            pw_metrics.inc("pw_http_responses_total", endpoint=request.endpoint, status=response.status_code)
+        return response
 
     @app.route("/", methods=["GET"])
     def index():
@@ -287,6 +425,7 @@ def create_app(default_wordlist=None, max_lines=200000, min_dict_len=4, exact_on
             max_lines=app.config["MAX_LINES"],
             min_dict_len=app.config["MIN_DICT_LEN"],
             exact_only=app.config["EXACT_ONLY"],
+            leet=app.config["LEET"],
             hash_file=app.config["HASH_FILE"],
             result=None, accepted=False, score=0, message="",
             loaded=len(app.config["WORDSET"]),
@@ -297,35 +436,43 @@ def create_app(default_wordlist=None, max_lines=200000, min_dict_len=4, exact_on
     @app.route("/check", methods=["POST"])
     def check():
         uploaded = request.files.get("wordlist_file")
-        uploaded_path = _save_uploaded_file(uploaded)
+        max_lines = int(request.form.get("max_lines") or app.config["MAX_LINES"])
+        uploaded_path = _save_uploaded_file(uploaded, app.config["UPLOADS"])
         path_field = (request.form.get("wordlist_path","") or app.config["WORDLIST_PATH"]).strip()
         wordlist_path_to_use = uploaded_path or path_field or ""
-        max_lines = int(request.form.get("max_lines") or app.config["MAX_LINES"])
         min_dict_len = int(request.form.get("min_dict_len") or app.config["MIN_DICT_LEN"])
         exact_only_flag = bool(request.form.get("exact_only")) or app.config["EXACT_ONLY"]
+        leet_flag = bool(request.form.get("leet")) or app.config["LEET"]
         hash_file = request.form.get("hash_file") or app.config["HASH_FILE"]
 
         username = normalize_text(request.form.get("username",""))
         password = normalize_text(request.form.get("password",""))
 
-        wordset = load_wordlist(wordlist_path_to_use, max_lines) if wordlist_path_to_use else app.config["WORDSET"]
-        ok, msg = validate_policy(password, username, wordset, min_dict_len, exact_only_flag)
         score = check_strength(password)
-
+        status = 200
+        try:
+            wordset = _wordset_for(wordlist_path_to_use, max_lines)
+            ok, msg = validate_policy(password, username, wordset, min_dict_len, exact_only_flag,
+                                      _history_for(hash_file, username), app.config["HASH_EXECUTOR"], leet_flag,
+                                      app.config["BREACH"], _fuzzy_for(wordset))
+        except OSError as e:
+            # Never fall back to checking without the dictionary
+            log.warning("Wordlist unavailable: %s", e)
+            wordset, ok, msg, status = (), False, WORDLIST_ERROR, 400
+        except HashBusy:
+            ok, msg, status = False, BUSY_MESSAGE, 429
+
+        hashed = None
         if ok:
             try:
-                os.makedirs(os.path.dirname(os.path.abspath(hash_file)), exist_ok=True)
-            except Exception:
-                pass
-            try:
-                with open(hash_file, "a", encoding="utf-8") as f:
-                    f.write(f"{username}:{hash_password(password)}\n")
-                try:
-                    os.chmod(hash_file, 0o600)
-                except Exception:
-                    pass
+                hashed = app.config["HASH_EXECUTOR"].hash(password)
+            except HashBusy:
+                ok, msg, status = False, BUSY_MESSAGE, 429
             except Exception as e:
-                log.exception("Failed writing hash: %s", e)
+                log.exception("Failed hashing password: %s", e)
+
+        if hashed:
+            _append_hash_lines(hash_file, [f"{username}:{hashed}\n"], app.config["HASH_FSYNC"])
 
         return render_template_string(
             TEMPLATE,
@@ -333,12 +480,13 @@ def create_app(default_wordlist=None, max_lines=200000, min_dict_len=4, exact_on
             max_lines=max_lines,
             min_dict_len=min_dict_len,
             exact_only=exact_only_flag,
+            leet=leet_flag,
             hash_file=hash_file,
             result=True, accepted=ok, score=score, message=msg,
             loaded=len(wordset),
             version=VERSION,
             max_hash_lines=MAX_HASH_LINES_SHOW
-        )
+        ), status
 
     @app.route("/hashes", methods=["POST"])
     def hashes():
@@ -352,6 +500,7 @@ def create_app(default_wordlist=None, max_lines=200000, min_dict_len=4, exact_on
             max_lines=app.config["MAX_LINES"],
             min_dict_len=app.config["MIN_DICT_LEN"],
             exact_only=app.config["EXACT_ONLY"],
+            leet=app.config["LEET"],
             hash_file=hash_file,
             result=None, accepted=False, score=0, message="",
             loaded=len(app.config["WORDSET"]),
@@ -361,6 +510,108 @@ def create_app(default_wordlist=None, max_lines=200000, min_dict_len=4, exact_on
             max_hash_lines=MAX_HASH_LINES_SHOW
         )
 
+    @app.route("/api/v1/check", methods=["POST"])
+    def api_check():
+        """JSON verdicts for one or many {username, password} items, without HTML rendering.
+
+        Body: {"items": [{"username": ..., "password": ...}, ...]} or a single item,
+        plus optional wordlist_path, max_lines, min_dict_len, exact_only, leet, hash_file
+        and store (hash and save accepted passwords, default true).
+        """
+        body = request.get_json(silent=True)
+        if isinstance(body, list):
+            body = {"items": body}
+        if not isinstance(body, dict):
+            return jsonify(error="expected a JSON object or array"), 400
+        items = body.get("items")
+        if items is None:
+            items = [body] if "password" in body else []
+        if not isinstance(items, list) or not all(isinstance(it, dict) for it in items):
+            return jsonify(error="items must be a list of objects"), 400
+        if len(items) > API_MAX_ITEMS:
+            return jsonify(error=f"at most {API_MAX_ITEMS} items per request"), 413
+
+        try:
+            max_lines = int(body.get("max_lines") or app.config["MAX_LINES"])
+            min_dict_len = int(body.get("min_dict_len") or app.config["MIN_DICT_LEN"])
+        except (TypeError, ValueError):
+            return jsonify(error="max_lines and min_dict_len must be integers"), 400
+        wordlist_path = str(body.get("wordlist_path") or "").strip()
+        exact_only_flag = bool(body.get("exact_only")) or app.config["EXACT_ONLY"]
+        leet_flag = bool(body.get("leet")) or app.config["LEET"]
+        hash_file = body.get("hash_file", app.config["HASH_FILE"])
+        if not isinstance(hash_file, str) or not hash_file.strip():
+            return jsonify(error="hash_file must be a non-empty string"), 400
+        store = body.get("store", True) is not False
+        try:
+            wordset = _wordset_for(wordlist_path, max_lines)
+        except OSError as e:
+            log.warning("Wordlist unavailable: %s", e)
+            return jsonify(error=WORDLIST_ERROR), 400
+        fuzzy = _fuzzy_for(wordset)
+
+        results, pending = [], []
+        inflight = deque()
+        creds = [(normalize_text(str(it.get("username") or "")), normalize_text(str(it.get("password") or "")))
+                 for it in items]
+        scores, _ = score_batch(password for _, password in creds)
+        for i, ((username, password), score) in enumerate(zip(creds, scores)):
+            res = {"index": i, "username": username, "score": score, "hash_stored": False}
+            results.append(res)
+            try:
+                rule, msg = check_policy(password, username, wordset, min_dict_len, exact_only_flag,
+                                         _history_for(hash_file, username), app.config["HASH_EXECUTOR"], leet_flag,
+                                         app.config["BREACH"], fuzzy)
+            except HashBusy:
+                res.update(accepted=False, rule=None, message=BUSY_MESSAGE, error="busy")
+                continue
+            res.update(accepted=rule is None, rule=rule, message=msg)
+            if rule is None and store:
+                while len(inflight) >= API_HASH_SLOTS:
+                    inflight.popleft().exception()  # wait for our oldest hash to free its slot
+                try:
+                    fut = app.config["HASH_EXECUTOR"].submit(password)
+                except HashBusy:
+                    res["error"] = "busy"
+                    continue
+                pending.append((res, fut))
+                inflight.append(fut)
+
+        lines = []
+        for res, fut in pending:
+            try:
+                lines.append(f"{res['username']}:{fut.result()}\n")
+                res["hash_stored"] = True
+            except Exception as e:
+                log.exception("Failed hashing password: %s", e)
+                res["error"] = "hash_failed"
+        if lines and not _append_hash_lines(hash_file, lines, app.config["HASH_FSYNC"]):
+            for res, _ in pending:
+                if res["hash_stored"]:
+                    res["hash_stored"], res["error"] = False, "write_failed"
+
+        return jsonify(count=len(results), loaded=len(wordset), results=results)
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics_route():
+        if not pw_metrics.enabled:
+            return Response("# metrics disabled; start with --metrics\n", mimetype="text/plain")
+        cache = app.config["WORDLIST_CACHE"].stats()
+        # hits/misses/coalesced/evictions only grow: export them as counters so rate() works
+        counters = {(f"pw_wordlist_cache_{k}_total", ()): cache.pop(k) for k in WORDLIST_CACHE_COUNTERS}
+        gauges = {("pw_wordlist_cache_" + k, ()): v for k, v in cache.items()}
+        # Only the default list: a per-path label would grow with every uploaded list
+        gauges[("pw_wordlist_entries", ())] = len(app.config["WORDSET"])
+        return Response(pw_metrics.render_prometheus(gauges, counters), mimetype="text/plain; version=0.0.4")
+
+    @app.route("/stats", methods=["GET"])
+    def stats():
+        watcher = app.config["WORDLIST_WATCHER"]
+        reloads = watcher and {"full": watcher.reloads, "append": watcher.appends, "errors": watcher.errors}
+        hashing = {k: app.config["HASH_PARAMS"][k] for k in ("argon2", "bcrypt", "path")}
+        return jsonify(wordlist_cache=app.config["WORDLIST_CACHE"].stats(), wordlist_reloads=reloads,
+                       uploads=app.config["UPLOADS"].usage(), hashing=dict(hashing, workers=hash_workers))
+
     return app
 
 def main():
@@ -371,11 +622,43 @@ def main():
     ap.add_argument("--max-lines", "-m", type=int, default=200000)
     ap.add_argument("--min-dict-len", type=int, default=4)
     ap.add_argument("--exact-only", action="store_true")
+    ap.add_argument("--leet", action="store_true", help="Also reject leetspeak variants of dictionary words.")
     ap.add_argument("--hash-file", default="./password_hashes.txt")
+    ap.add_argument("--fuzzy", type=int, default=0, metavar="K",
+                    help="Also reject near-misses within K edits of a dictionary word (0 = off; 1 recommended).")
+    ap.add_argument("--fuzzy-min-len", type=int, default=6, help="Shortest dictionary word matched fuzzily.")
+    ap.add_argument("--fuzzy-index", help="Prebuilt .pwfz fuzzy index for the default wordlist (see pw_fuzzy.py).")
+    ap.add_argument("--breach-dump", help="Sorted SHA-1/NTLM HASH:COUNT dump; passwords found in it are rejected.")
     ap.add_argument("--no-browser", action="store_true")
+    ap.add_argument("--reload-interval", type=float, default=0,
+                    help="Poll the default wordlist every N seconds and swap in changes without a restart (0 = off).")
+    ap.add_argument("--shared-wordlist", action="store_true",
+                    help="Compile the default wordlist once and mmap it, so worker processes share one copy.")
+    ap.add_argument("--shared-dir", help="Where shared compiled wordlists are kept (default: <tmp>/pw-enforcer).")
+    ap.add_argument("--wordlist-cache-mb", type=int, default=512, help="Memory budget for cached per-request wordlists.")
+    ap.add_argument("--upload-max-mb", type=int, default=1024,
+                    help="Disk budget for uploaded wordlists; least recently uploaded are evicted.")
+    ap.add_argument("--hash-workers", type=int,
+                    help="Concurrent password hashes (default: from --hash-config, else 2; each uses memory_cost KiB).")
+    ap.add_argument("--hash-config",
+                    help="Hashing cost parameters from pw_calibrate.py (default: $PW_HASH_CONFIG or ./pw_hash_params.json).")
+    ap.add_argument("--hash-queue", type=int, default=8, help="Hash jobs allowed to wait for a worker.")
+    ap.add_argument("--hash-timeout", type=float, default=5.0, help="Seconds to wait for a hash slot before answering 429.")
+    ap.add_argument("--metrics", action="store_true", help="Record per-stage timings and serve them on /metrics.")
+    ap.add_argument("--hash-fsync", choices=FSYNC_POLICIES, default="commit",
+                    help="fsync the hash file after every group commit, about once a second, or never.")
+    ap.add_argument("--history-depth", type=int, default=0,
+                    help="Reject passwords matching any of the user's last N stored hashes (0 = off).")
     args = ap.parse_args()
 
-    app = create_app(args.wordlist, args.max_lines, args.min_dict_len, args.exact_only, args.hash_file)
+    app = create_app(args.wordlist, args.max_lines, args.min_dict_len, args.exact_only, args.hash_file,
+                     wordlist_cache_mb=args.wordlist_cache_mb, hash_workers=args.hash_workers,
+                     hash_queue=args.hash_queue, hash_timeout=args.hash_timeout, metrics=args.metrics,
+                     hash_fsync=args.hash_fsync, history_depth=args.history_depth, leet=args.leet,
+                     reload_interval=args.reload_interval, shared_wordlist=args.shared_wordlist,
+                     shared_dir=args.shared_dir, upload_max_mb=args.upload_max_mb, breach_dump=args.breach_dump,
+                     fuzzy=args.fuzzy, fuzzy_min_len=args.fuzzy_min_len, fuzzy_file=args.fuzzy_index,
+                     hash_config=args.hash_config)
 
     url = f"http://{args.host}:{args.port}/"
     if not args.no_browser:
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner for PW Enforcer's hot paths.
+
+Measures wordlist loading, dictionary checks (exact-only and substring),
+strength scoring and hashing across the bundled wordlists, plus the CLI's
+start-up time. Every case runs in
+a fresh process, so peak RSS is per case. Results can be saved as a JSON
+baseline and compared against a later run.
+
+Usage:
+  python pw_bench.py                                # run and print a table
+  python pw_bench.py --save bench/baseline.json     # store a baseline
+  python pw_bench.py --compare bench/baseline.json  # exit 1 on regressions
+"""
+import os, sys, json, time, random, string, argparse, platform, resource, itertools, subprocess, multiprocessing
+
+import pw_core
+from pw_wordlist import open_wordlist_index
+
+DEFAULT_WORDLISTS = [
+    "wordlists/jack_the_reaper.txt",
+    "wordlists/rockyou_combined_uniq.txt",
+    "wordlists/rockyou_combined.txt",
+]
+SEED = 1337
+SAMPLE_WORDS = 50_000
+
+def _peak_rss_kib() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def _is_text_wordlist(path) -> bool:
+    return bool(path) and os.path.isfile(path) and open_wordlist_index(path) is None
+
+def _sample_words(path, limit: int = SAMPLE_WORDS):
+    """Words to decorate, read from a text wordlist (compiled and Bloom backends cannot be enumerated)."""
+    if not _is_text_wordlist(path):
+        return []
+    return sorted(itertools.islice(pw_core.iter_wordlist(path, 0), limit))
+
+def _sample_passwords(words, count: int, seed: int = SEED):
+    """Deterministic mix of decorated dictionary words and random strings."""
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
+    words = list(words) or ["password"]
+    out = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            w = rng.choice(words)
+            w = w.capitalize() if rng.random() < 0.5 else w
+            out.append(rng.choice(["", "!", "@", "#1"]) + w + str(rng.randint(0, 9999)))
+        else:
+            out.append("".join(rng.choice(alphabet) for _ in range(rng.randint(8, 20))))
+    return out
+
+def _timed(fn, inputs):
+    lat = []
+    clock = time.perf_counter
+    for x in inputs:
+        t0 = clock()
+        fn(x)
+        lat.append(clock() - t0)
+    return lat
+
+def _run_case(case: dict) -> dict:
+    """Run one benchmark case; executed in a fresh child process."""
+    stage, path, n = case["stage"], case.get("wordlist"), case["iterations"]
+    if stage == "load":
+        lat = _timed(lambda p: pw_core.load_wordlist(p, 0), [path] * n)
+        entries = len(pw_core.load_wordlist(path, 0))
+    elif stage == "startup":
+        # Whole-process wall time of the cheapest CLI call, as scripts see it
+        cli = os.path.join(os.path.dirname(os.path.abspath(__file__)), "password_enforcer_cli.py")
+        cmd = [sys.executable, cli, "--quiet", "--show-hashes", "--hash-file", os.devnull + ".missing"]
+        lat = _timed(lambda c: subprocess.run(c, check=True, stdout=subprocess.DEVNULL), [cmd] * n)
+        entries = 0
+    elif stage == "hash":
+        lat = _timed(pw_core.hash_password, _sample_passwords([], n))
+        entries = 0
+    else:
+        wordset = pw_core.as_matcher(pw_core.load_wordlist(path, 0)) if path else set()
+        entries = len(wordset)
+        passwords = _sample_passwords(_sample_words(case.get("sample")), n)
+        if stage == "strength":
+            lat = _timed(pw_core.check_strength, passwords)
+        else:
+            exact = stage == "check-exact"
+            min_len = pw_core.DEFAULT_MIN_DICT_LEN
+            lat = _timed(lambda p: pw_core.contains_dictionary_word(p, wordset, min_len, exact), passwords)
+    lat.sort()
+    total = sum(lat)
+    return {
+        "stage": stage,
+        "wordlist": os.path.basename(path) if path else None,
+        "entries": entries,
+        "iterations": len(lat),
+        "ops_per_sec": len(lat) / total if total else float("inf"),
+        "p50_ms": lat[len(lat) // 2] * 1000,
+        "p99_ms": lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000,
+        "peak_rss_kib": _peak_rss_kib(),
+    }
+
+def build_cases(wordlists, check_iterations: int, load_iterations: int, hash_iterations: int,
+                startup_iterations: int = 0, sample_from: str = None):
+    # Binary backends draw their check inputs from --sample-from, else the first text list
+    fallback = sample_from or next((p for p in wordlists if _is_text_wordlist(p)), None)
+    cases = []
+    if startup_iterations:
+        cases.append({"stage": "startup", "wordlist": None, "iterations": startup_iterations})
+    for path in wordlists:
+        cases.append({"stage": "load", "wordlist": path, "iterations": load_iterations})
+        sample = path if _is_text_wordlist(path) else fallback
+        cases.append({"stage": "check-exact", "wordlist": path, "sample": sample, "iterations": check_iterations})
+        cases.append({"stage": "check-substring", "wordlist": path, "sample": sample, "iterations": check_iterations})
+    cases.append({"stage": "strength", "wordlist": None, "iterations": check_iterations})
+    if hash_iterations:
+        cases.append({"stage": "hash", "wordlist": None, "iterations": hash_iterations})
+    return cases
+
+def _case_key(r: dict) -> str:
+    return f"{r['stage']}:{r['wordlist'] or '-'}"
+
+def compare(results, baseline, threshold: float):
+    """Return (key, metric, old, new, change) tuples for regressions beyond threshold."""
+    old = {_case_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        b = old.get(_case_key(r))
+        if not b:
+            continue
+        for metric, higher_is_better in (("ops_per_sec", True), ("p99_ms", False), ("peak_rss_kib", False)):
+            if not b[metric]:
+                continue
+            change = (r[metric] - b[metric]) / b[metric]
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append((_case_key(r), metric, b[metric], r[metric], change))
+    return regressions
+
+def print_table(results):
+    print(f"{'stage':<16} {'wordlist':<28} {'entries':>9} {'ops/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'peak RSS':>10}")
+    for r in results:
+        print(f"{r['stage']:<16} {(r['wordlist'] or '-'):<28} {r['entries']:>9,} {r['ops_per_sec']:>12,.0f} "
+              f"{r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['peak_rss_kib'] // 1024:>7,} MiB")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="PW Enforcer benchmark suite")
+    ap.add_argument("--wordlist", "-w", action="append", help="Wordlist to benchmark (repeatable; default: bundled lists)")
+    ap.add_argument("--sample-from", metavar="FILE",
+                    help="Text wordlist to draw check inputs from for compiled/Bloom lists (default: first text list)")
+    ap.add_argument("--iterations", "-n", type=int, default=5000, help="Passwords per check/strength case")
+    ap.add_argument("--load-iterations", type=int, default=3, help="Loads per wordlist")
+    ap.add_argument("--hash-iterations", type=int, default=5, help="Hashes for the hash case (0 to skip)")
+    ap.add_argument("--startup-iterations", type=int, default=10, help="CLI launches for the startup case (0 to skip)")
+    ap.add_argument("--save", metavar="FILE", help="Write results as a JSON baseline")
+    ap.add_argument("--compare", metavar="FILE", help="Compare against a saved baseline; exit 1 on regressions")
+    ap.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression")
+    args = ap.parse_args(argv)
+
+    wordlists = args.wordlist or [p for p in DEFAULT_WORDLISTS if os.path.isfile(p)]
+    cases = build_cases(wordlists, args.iterations, args.load_iterations, args.hash_iterations,
+                        args.startup_iterations, args.sample_from)
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for case in cases:
+        with ctx.Pool(1) as pool:
+            results.append(pool.apply(_run_case, (case,)))
+    print_table(results)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as fh:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(),
+                       "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, fh, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            regressions = compare(results, json.load(fh), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for key, metric, old, new, change in regressions:
+                print(f"  {key:<45} {metric:<13} {old:>12,.3f} -> {new:>12,.3f} ({change:+.1%})")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Offline breached-password lookups for PW Enforcer.
+
+Breach corpora are distributed as text dumps of `HASH:COUNT` lines sorted by
+hash (SHA-1 or NTLM, e.g. the Pwned Passwords downloads). They are far too
+large to load, so a dump is mmapped and binary-searched in place: a lookup
+touches a few pages and memory does not grow with the dump size.
+
+An optional prefix index (`<dump>.pwbi`) stores the byte offset at which each
+16-bit hash prefix starts, so a lookup only searches one bucket (about
+1/65536 of the file) instead of the whole dump.
+
+Usage:
+  python pw_breach.py build-index pwned-passwords-sha1-ordered-by-hash.txt
+  python pw_breach.py from-wordlist wordlists/jack_the_reaper.txt breached.txt --hash ntlm
+  python pw_breach.py lookup pwned-passwords-sha1-ordered-by-hash.txt
+"""
+import os, sys, mmap, struct, getpass, hashlib, argparse, logging
+
+log = logging.getLogger("pw_breach")
+
+HASH_LENGTHS = {40: "sha1", 32: "ntlm"}   # hex digits per line -> algorithm
+
+# Prefix index layout (little-endian):
+#   header  : magic(8) | prefix bits (u32) | dump size (u64) | dump mtime_ns (u64)
+#   offsets : (2**bits + 1) u64 byte offsets; bucket p spans offsets[p]..offsets[p+1]
+INDEX_MAGIC = b"PWBI\x01\x00\x00\x00"
+INDEX_SUFFIX = ".pwbi"
+_INDEX_HEADER = struct.Struct("<8sIQQ")
+PREFIX_BITS = 16
+
+def _md4(data: bytes) -> bytes:
+    """MD4 (RFC 1320), for NTLM; OpenSSL 3 no longer provides it to hashlib."""
+    msg = data + b"\x80" + b"\x00" * ((55 - len(data)) % 64) + struct.pack("<Q", len(data) * 8)
+    mask = 0xFFFFFFFF
+    rol = lambda x, n: ((x << n) | (x >> (32 - n))) & mask
+    h = [0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476]
+    rounds = (
+        (lambda b, c, d: (b & c) | (~b & d), 0, range(16), (3, 7, 11, 19)),
+        (lambda b, c, d: (b & c) | (b & d) | (c & d), 0x5A827999,
+         (0, 4, 8, 12, 1, 5, 9, 13, 2, 6, 10, 14, 3, 7, 11, 15), (3, 5, 9, 13)),
+        (lambda b, c, d: b ^ c ^ d, 0x6ED9EBA1,
+         (0, 8, 4, 12, 2, 10, 6, 14, 1, 9, 5, 13, 3, 11, 7, 15), (3, 9, 11, 15)),
+    )
+    for off in range(0, len(msg), 64):
+        x = struct.unpack_from("<16I", msg, off)
+        a, b, c, d = h
+        for f, const, order, shifts in rounds:
+            for i, k in enumerate(order):
+                a = rol((a + f(b, c, d) + x[k] + const) & mask, shifts[i % 4])
+                a, b, c, d = d, a, b, c
+        h = [(v + w) & mask for v, w in zip(h, (a, b, c, d))]
+    return struct.pack("<4I", *h)
+
+def ntlm_hash(password: str) -> str:
+    data = password.encode("utf-16-le", "surrogatepass")
+    try:
+        digest = hashlib.new("md4", data).digest()
+    except ValueError:
+        digest = _md4(data)
+    return digest.hex().upper()
+
+def sha1_hash(password: str) -> str:
+    return hashlib.sha1(password.encode("utf-8", "surrogateescape")).hexdigest().upper()
+
+HASHERS = {"sha1": sha1_hash, "ntlm": ntlm_hash}
+
+def index_path(dump: str) -> str:
+    return dump + INDEX_SUFFIX
+
+class BreachDump:
+    """Read-only view of a sorted HASH[:COUNT] dump; `count(password)` gives its breach count.
+
+    The hash type and letter case are taken from the first line. A prefix
+    index next to the dump is used when it matches the dump's size and mtime.
+    """
+    def __init__(self, path: str, use_index: bool = True):
+        self.path = path
+        st = os.stat(path)
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) if st.st_size else b""
+        first = bytes(self._mm[:self._mm.find(b"\n") if self._mm.find(b"\n") >= 0 else len(self._mm)])
+        key = first.split(b":", 1)[0].strip()
+        self.algorithm = HASH_LENGTHS.get(len(key))
+        if self.algorithm is None:
+            raise ValueError(f"{path}: first line is not a SHA-1 or NTLM hex hash")
+        self.hash_len = len(key)
+        self._lower = key != key.upper()
+        self._hash = HASHERS[self.algorithm]
+        self._offsets = self._load_index(st) if use_index else None
+
+    def _load_index(self, st):
+        try:
+            with open(index_path(self.path), "rb") as fh:
+                head = fh.read(_INDEX_HEADER.size)
+                magic, bits, size, mtime_ns = _INDEX_HEADER.unpack(head)
+                if magic != INDEX_MAGIC or (size, mtime_ns) != (st.st_size, st.st_mtime_ns):
+                    log.warning("Ignoring stale breach index %s; rebuild it with build-index", index_path(self.path))
+                    return None
+                offsets = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, struct.error):
+            return None
+        self._bits = bits
+        return offsets
+
+    def _bucket(self, key: bytes):
+        if self._offsets is None:
+            return 0, len(self._mm)
+        p = int(key[:4], 16) >> (16 - self._bits)
+        return struct.unpack_from("<QQ", self._offsets, _INDEX_HEADER.size + p * 8)
+
+    def lookup_hash(self, key: bytes) -> int:
+        """Breach count for a hex hash (bytes, in the dump's case); 0 if absent."""
+        mm, n = self._mm, self.hash_len
+        lo, hi = self._bucket(key)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = mm.rfind(b"\n", lo, mid) + 1 or lo
+            end = mm.find(b"\n", start)
+            if end < 0:
+                end = len(mm)
+            probe = mm[start:start + n]
+            if probe == key:
+                count = mm[start + n + 1:end].strip()
+                return int(count) if count.isdigit() else 1
+            if probe < key:
+                lo = end + 1
+            else:
+                hi = start
+        return 0
+
+    def count(self, password: str) -> int:
+        key = self._hash(password)
+        return self.lookup_hash((key.lower() if self._lower else key).encode("ascii"))
+
+    def __contains__(self, password: str) -> bool:
+        return self.count(password) > 0
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        if self._offsets is not None:
+            self._offsets.close()
+
+def build_index(dump: str, dest: str = None, bits: int = PREFIX_BITS) -> int:
+    """Write the prefix index for `dump` in one sequential pass; returns the line count."""
+    dest = dest or index_path(dump)
+    st = os.stat(dump)
+    buckets = 1 << bits
+    offsets = [None] * (buckets + 1)
+    lines = 0
+    with open(dump, "rb", buffering=1 << 20) as fh:
+        pos = 0
+        for line in fh:
+            try:
+                p = int(line[:4], 16) >> (16 - bits)
+            except ValueError:
+                p = None  # blank or malformed line: lookups skip over it
+            if p is not None:
+                if offsets[p] is None:
+                    offsets[p] = pos
+                lines += 1
+            pos += len(line)
+    offsets[buckets] = st.st_size
+    # Empty buckets start where the next non-empty one does
+    for p in range(buckets - 1, -1, -1):
+        if offsets[p] is None:
+            offsets[p] = offsets[p + 1]
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as out:
+        out.write(_INDEX_HEADER.pack(INDEX_MAGIC, bits, st.st_size, st.st_mtime_ns))
+        out.write(struct.pack(f"<{buckets + 1}Q", *offsets))
+    os.replace(tmp, dest)
+    return lines
+
+def dump_from_wordlist(src: str, dest: str, algorithm: str = "sha1", max_lines: int = 0) -> int:
+    """Hash a plaintext list into a sorted HASH:COUNT dump (in memory; for local corpora).
+
+    Lines are decoded as UTF-8 and keep their case, so each hash matches what
+    count() computes for the same password; undecodable bytes are hashed as is.
+    """
+    counts = {}
+    hasher = HASHERS[algorithm]
+    with open(src, "rb") as fh:
+        raw = (line.rstrip(b"\r\n").decode("utf-8", "surrogateescape") for line in fh)
+        for i, word in enumerate(raw):
+            if max_lines and i >= max_lines:
+                break
+            if word:
+                key = hasher(word)
+                counts[key] = counts.get(key, 0) + 1
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="ascii") as out:
+        for key in sorted(counts):
+            out.write(f"{key}:{counts[key]}\n")
+    os.replace(tmp, dest)
+    return len(counts)
+
+def open_breach_dump(path: str):
+    """BreachDump for `path`, or None if no dump is configured.
+
+    A configured dump that is missing or unreadable raises (OSError or
+    ValueError) rather than silently turning breach checks off.
+    """
+    return BreachDump(path) if path else None
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="PW Enforcer breach dump tools")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    ip = sub.add_parser("build-index", help="Build the prefix index (<dump>.pwbi) for a sorted hash dump")
+    ip.add_argument("dump", help="Sorted HASH:COUNT dump (SHA-1 or NTLM)")
+    ip.add_argument("--output", "-o", help="Index path (default: <dump>.pwbi)")
+    ip.add_argument("--bits", type=int, default=PREFIX_BITS, choices=range(4, 17), metavar="4-16",
+                    help="Hash prefix bits per bucket")
+
+    wp = sub.add_parser("from-wordlist", help="Hash a plaintext list into a sorted dump")
+    wp.add_argument("src", help="Plaintext list, one password per line")
+    wp.add_argument("dest", help="Output dump")
+    wp.add_argument("--hash", choices=sorted(HASHERS), default="sha1", help="Hash algorithm")
+    wp.add_argument("--max-lines", "-m", type=int, default=0, help="Max lines to read (0 = all)")
+
+    lp = sub.add_parser("lookup", help="Look up a password (prompted, or one per line on stdin)")
+    lp.add_argument("dump", help="Sorted hash dump")
+
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "build-index":
+        lines = build_index(args.dump, args.output, args.bits)
+        log.info("Indexed %s hashes into %s", f"{lines:,}", args.output or index_path(args.dump))
+    elif args.command == "from-wordlist":
+        total = dump_from_wordlist(args.src, args.dest, args.hash, args.max_lines)
+        log.info("Wrote %s %s hashes to %s", f"{total:,}", args.hash, args.dest)
+    elif args.command == "lookup":
+        dump = BreachDump(args.dump)
+        passwords = [getpass.getpass("Password: ")] if sys.stdin.isatty() else (ln.rstrip("\r\n") for ln in sys.stdin)
+        for password in passwords:
+            print(dump.count(password))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
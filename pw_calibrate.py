@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Calibrate PW Enforcer's password-hashing cost for this host.
+
+Benchmarks Argon2id over a ladder of memory costs and picks the strongest
+parameters (largest memory x time cost) that hash within a target latency
+while a pool of concurrent hashes still reaches a hashes/sec goal inside a
+memory budget. The bcrypt fallback's rounds are picked the same way. The
+result is written as JSON; pw_core reads it on first hash and both entry
+points load it at start-up (--hash-config, $PW_HASH_CONFIG or
+./pw_hash_params.json). The web UI also takes its default --hash-workers
+from it.
+
+Usage:
+  python pw_calibrate.py                                     # 250 ms, 4 hashes/s, 1 GiB
+  python pw_calibrate.py --target-ms 500 --rate 20 --memory-mb 4096 --workers 8
+  python pw_calibrate.py --dry-run                           # print, do not write
+"""
+import os, sys, json, time, argparse, platform, statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from pw_core import DEFAULT_HASH_CONFIG, BCRYPT_DEFAULT_ROUNDS
+
+# Memory costs tried, in KiB: the OWASP minimum (19 MiB) then powers of two up to 1 GiB
+MEMORY_LADDER = [19 * 1024] + [1024 << k for k in range(5, 11)]
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+SAMPLE = "calibrate-Pa55word!"
+
+def _median_ms(fn, runs: int) -> float:
+    fn()  # warm-up: first call pays allocation and import costs
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+def measure_rate(fn, workers: int, hashes: int) -> float:
+    """Hashes/sec with `workers` threads hashing concurrently (as HashExecutor does)."""
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(lambda _: fn(), range(workers)))  # warm every thread
+        t0 = time.perf_counter()
+        list(pool.map(lambda _: fn(), range(hashes)))
+        return hashes / (time.perf_counter() - t0)
+
+def estimate_rate(latency_ms: float, workers: int, threads_per_hash: int, cores: int) -> float:
+    """Concurrent hashes/sec, assuming a hash is CPU-bound and cores are shared evenly."""
+    busy = workers * min(threads_per_hash, cores)
+    return workers * 1000 / latency_ms * min(1.0, cores / busy)
+
+def _argon2_hasher(time_cost, memory_cost, parallelism):
+    from argon2 import PasswordHasher
+    ph = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    return lambda: ph.hash(SAMPLE)
+
+def calibrate_argon2(target_ms, rate, memory_kib, parallelism, workers, max_time_cost=10, runs=3, log=print):
+    """Pick Argon2 parameters; returns a result dict (see main()) or None if nothing fits the budget."""
+    cores = os.cpu_count() or 1
+    candidates = []
+    for m in MEMORY_LADDER:
+        if m > memory_kib:
+            break
+        base = _median_ms(_argon2_hasher(1, m, parallelism), runs)
+        if base > target_ms:
+            log(f"  m={m >> 10} MiB t=1: {base:.0f} ms (over target)")
+            break
+        # Cost grows about linearly with time_cost; step down if the guess overshoots
+        t = max(1, min(max_time_cost, int(target_ms // base)))
+        latency = base if t == 1 else _median_ms(_argon2_hasher(t, m, parallelism), runs)
+        while t > 1 and latency > target_ms:
+            t -= 1
+            latency = _median_ms(_argon2_hasher(t, m, parallelism), runs)
+        while t < max_time_cost and latency * (t + 1) / t <= target_ms:
+            longer = _median_ms(_argon2_hasher(t + 1, m, parallelism), runs)
+            if longer > target_ms:
+                break
+            t, latency = t + 1, longer
+        pool = max(1, min(workers, memory_kib // m))
+        est = estimate_rate(latency, pool, parallelism, cores)
+        log(f"  m={m >> 10} MiB t={t}: {latency:.0f} ms, ~{est:.1f} hashes/s with {pool} workers")
+        candidates.append({"time_cost": t, "memory_cost": m, "latency_ms": latency, "workers": pool, "rate": est})
+    if not candidates:
+        return None
+
+    # Strongest first; confirm the estimate with a real concurrent run before accepting it
+    for c in sorted(candidates, key=lambda c: (c["memory_cost"] * c["time_cost"], c["memory_cost"]), reverse=True):
+        if c["rate"] < rate:
+            continue
+        fn = _argon2_hasher(c["time_cost"], c["memory_cost"], parallelism)
+        c["rate"] = measure_rate(fn, c["workers"], max(4, 2 * c["workers"]))
+        if c["rate"] >= rate * 0.9:
+            return dict(c, meets_goal=True)
+        log(f"  m={c['memory_cost'] >> 10} MiB t={c['time_cost']}: measured {c['rate']:.1f} hashes/s, below goal")
+    return dict(max(candidates, key=lambda c: c["rate"]), meets_goal=False)
+
+def calibrate_bcrypt(target_ms, rate, workers, runs=3, log=print):
+    """Highest bcrypt rounds within the latency target and rate goal; None without bcrypt."""
+    try:
+        import bcrypt
+    except ImportError:
+        return None
+    cores = os.cpu_count() or 1
+    best = None
+    for rounds in range(BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS + 1):
+        salt = bcrypt.gensalt(rounds=rounds)
+        latency = _median_ms(lambda: bcrypt.hashpw(SAMPLE.encode(), salt), runs)
+        est = estimate_rate(latency, workers, 1, cores)
+        log(f"  rounds={rounds}: {latency:.0f} ms, ~{est:.1f} hashes/s with {workers} workers")
+        if latency > target_ms or est < rate:
+            break
+        best = {"rounds": rounds, "latency_ms": latency, "rate": est}
+    # Each round doubles the cost, so the minimum is the best we can do when it misses
+    return dict(best, meets_goal=True) if best else {"rounds": BCRYPT_MIN_ROUNDS, "meets_goal": False}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Calibrate password-hashing cost parameters for this host")
+    ap.add_argument("--target-ms", type=float, default=250, help="Target latency of one hash, in ms")
+    ap.add_argument("--rate", type=float, default=4, help="Concurrent hashes/sec the server must sustain")
+    ap.add_argument("--memory-mb", type=int, default=1024, help="Memory budget for all concurrent Argon2 hashes")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Most concurrent hashes (hash workers)")
+    ap.add_argument("--parallelism", type=int, default=min(4, os.cpu_count() or 1), help="Argon2 lanes per hash")
+    ap.add_argument("--max-time-cost", type=int, default=10, help="Largest Argon2 time cost considered")
+    ap.add_argument("--runs", type=int, default=3, help="Timed hashes per candidate (median is used)")
+    ap.add_argument("--output", "-o", default=DEFAULT_HASH_CONFIG, help="Config file to write")
+    ap.add_argument("--dry-run", action="store_true", help="Print the recommendation without writing it")
+    args = ap.parse_args(argv)
+    log = lambda msg: print(msg, file=sys.stderr)
+
+    log("Argon2id:")
+    try:
+        argon2 = calibrate_argon2(args.target_ms, args.rate, args.memory_mb * 1024, args.parallelism,
+                                  args.workers, args.max_time_cost, args.runs, log)
+    except ImportError:
+        argon2 = None
+        log("  argon2-cffi is not installed; only bcrypt is calibrated")
+    else:
+        if argon2 is None:
+            log(f"  even {MEMORY_LADDER[0] >> 10} MiB, t=1 misses {args.target_ms:g} ms "
+                f"or the {args.memory_mb} MiB budget; raise --target-ms or --memory-mb")
+            return 1
+    log("bcrypt:")
+    bcrypt = calibrate_bcrypt(args.target_ms, args.rate, args.workers, args.runs, log)
+    if bcrypt is None:
+        log("  bcrypt is not installed; keeping the default rounds")
+        bcrypt = {"rounds": BCRYPT_DEFAULT_ROUNDS, "meets_goal": False}
+
+    primary = argon2 or bcrypt
+    if not primary["meets_goal"]:
+        log(f"warning: {args.rate:g} hashes/s within {args.target_ms:g} ms is not reachable here; "
+            "using the fastest parameters measured")
+    config = {
+        "argon2": argon2 and {"time_cost": argon2["time_cost"], "memory_cost": argon2["memory_cost"],
+                              "parallelism": args.parallelism},
+        "bcrypt": {"rounds": bcrypt["rounds"]},
+        "hash_workers": argon2["workers"] if argon2 else args.workers,
+        "calibration": {
+            "host": platform.node(), "cpus": os.cpu_count(), "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "target_ms": args.target_ms, "rate": args.rate, "memory_mb": args.memory_mb,
+            "argon2_ms": argon2 and round(argon2["latency_ms"], 1), "argon2_rate": argon2 and round(argon2["rate"], 1),
+            "bcrypt_ms": bcrypt.get("latency_ms") and round(bcrypt["latency_ms"], 1),
+            "meets_goal": primary["meets_goal"],
+        },
+    }
+    if not argon2:
+        del config["argon2"]
+    text = json.dumps(config, indent=2)
+    print(text)
+    if not args.dry_run:
+        tmp = f"{args.output}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+        os.replace(tmp, args.output)
+        log(f"Wrote {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,8 @@
 # pw_core.py
-import os, re, unicodedata
+import io, os, string, logging, threading, unicodedata, weakref
+import pw_metrics as _metrics
 
-# Hashing: Argon2 preferred, bcrypt fallback
-try:
-    from argon2 import PasswordHasher
-    _HAS_ARGON2 = True
-    PH = PasswordHasher(time_cost=2, memory_cost=102400)
-except Exception:
-    _HAS_ARGON2 = False
-    import bcrypt
+log = logging.getLogger("pw_core")
 
 COMMON_PASSWORDS = {"123456","password","qwerty","admin","letmein","12345678","111111"}
 DEFAULT_MAX_WORDLIST_LINES = 200_000
@@ -17,59 +11,505 @@ DEFAULT_MIN_DICT_LEN = 4
 def normalize_text(s: str) -> str:
     return unicodedata.normalize("NFKC", s or "").strip()
 
+# Character classes for the one-pass classifier. The strength symbols are the
+# ASCII punctuation the scoring regex used to match; the policy's allowed
+# symbols are the narrower set @$!%*?&.
+_UPPER = frozenset(string.ascii_uppercase)
+_LOWER = frozenset(string.ascii_lowercase)
+_DIGITS = frozenset(string.digits)
+_STRENGTH_SYMBOLS = frozenset(string.punctuation)
+_POLICY_SYMBOLS = frozenset("@$!%*?&")
+_POLICY_CHARSET = _UPPER | _LOWER | _DIGITS | _POLICY_SYMBOLS
+
+def _classify(password: str) -> tuple:
+    """Every character-class flag in one pass: (length, upper, lower, digit, symbol, policy_ok).
+
+    policy_ok matches the historical regex
+    ^(?=.*[a-z])(?=.*[A-Z])(?=.*\\d)(?=.*[@$!%*?&])[A-Za-z\\d@$!%*?&]{8,}$
+    including its quirks: \\d accepts any Unicode decimal digit and $ tolerates
+    one trailing newline.
+    """
+    chars = set(password)
+    upper = not chars.isdisjoint(_UPPER)
+    lower = not chars.isdisjoint(_LOWER)
+    digit = not chars.isdisjoint(_DIGITS)
+    if password.endswith("\n"):
+        body = password[:-1]
+        body_chars = set(body)
+    else:
+        body, body_chars = password, chars
+    policy_ok = (len(body) >= 8 and upper and lower and not body_chars.isdisjoint(_POLICY_SYMBOLS)
+                 and (body_chars <= _POLICY_CHARSET
+                      or all(c in _POLICY_CHARSET or c.isdecimal() for c in body_chars))
+                 and (digit or any(c.isdecimal() for c in body_chars)))
+    return (len(password), upper, lower, digit, not chars.isdisjoint(_STRENGTH_SYMBOLS), policy_ok)
+
+def strength_score(classes) -> int:
+    length, upper, lower, digit, symbol, _ = classes
+    return (length >= 8) + (length >= 12) + upper + lower + digit + symbol
+
 def check_strength(password: str) -> int:
-    score = 0
-    if len(password) >= 8: score += 1
-    if len(password) >= 12: score += 1
-    if re.search(r"[A-Z]", password): score += 1
-    if re.search(r"[a-z]", password): score += 1
-    if re.search(r"[0-9]", password): score += 1
-    if re.search(r"[!@#$%^&*()_+\-=\[\]{};':\",.<>/?\\|`~]", password): score += 1
-    return score
+    return strength_score(_classify(password))
 
 def meets_regex_policy(password: str) -> bool:
-    pattern = r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$'
-    return bool(re.match(pattern, password))
-
-def load_wordlist(path: str, max_lines: int = DEFAULT_MAX_WORDLIST_LINES) -> set:
-    if not path or path.endswith(".gz") or not os.path.isfile(path):
-        return set()
-    wordset = set()
-    with open(path, "r", encoding="latin-1", errors="ignore") as fh:
+    return _classify(password)[5]
+
+# Batch scoring: lookup-table bits per ASCII code point
+_BIT_UPPER, _BIT_LOWER, _BIT_DIGIT, _BIT_SYMBOL, _BIT_PSYMBOL, _BIT_ALLOWED = 1, 2, 4, 8, 16, 32
+BATCH_CHUNK = 65_536
+
+def _class_table(np):
+    table = np.zeros(128, dtype=np.uint8)
+    for chars, bit in ((_UPPER, _BIT_UPPER), (_LOWER, _BIT_LOWER), (_DIGITS, _BIT_DIGIT),
+                       (_STRENGTH_SYMBOLS, _BIT_SYMBOL), (_POLICY_SYMBOLS, _BIT_PSYMBOL),
+                       (_POLICY_CHARSET, _BIT_ALLOWED)):
+        for c in chars:
+            table[ord(c)] |= bit
+    table[0] |= _BIT_ALLOWED  # padding
+    return table
+
+def score_batch(passwords):
+    """Strength scores and policy verdicts for many passwords: (scores, policy_ok) lists.
+
+    Uses NumPy over one UTF-32 code-point buffer per chunk when available.
+    Passwords the table cannot classify exactly (non-ASCII, NUL, trailing
+    newline) take the scalar path, so results are identical to
+    check_strength/meets_regex_policy.
+    """
+    passwords = list(passwords)
+    try:
+        import numpy as np
+    except ImportError:
+        classes = [_classify(p) for p in passwords]
+        return [strength_score(c) for c in classes], [c[5] for c in classes]
+    table = _class_table(np)
+    scores, policy = [], []
+    for start in range(0, len(passwords), BATCH_CHUNK):
+        chunk = passwords[start:start + BATCH_CHUNK]
+        # Every password is followed by a NUL separator, so each segment is non-empty
+        codes = np.frombuffer(("\x00".join(chunk) + "\x00").encode("utf-32-le"), dtype=np.uint32)
+        lengths = np.fromiter(map(len, chunk), dtype=np.int64, count=len(chunk))
+        starts = np.zeros(len(chunk), dtype=np.int64)
+        np.cumsum(lengths[:-1] + 1, out=starts[1:])
+        bits = table[np.minimum(codes, 127)]
+        seen = np.bitwise_or.reduceat(bits, starts)
+        allowed = np.bitwise_and.reduceat(bits, starts) & _BIT_ALLOWED
+        last = codes[starts + np.maximum(lengths - 1, 0)]
+        exotic = ((np.maximum.reduceat(codes, starts) >= 128) | ((lengths > 0) & (last == 10))
+                  | (np.add.reduceat(codes == 0, starts) != 1))
+        has = lambda bit: (seen & bit) != 0
+        score = ((lengths >= 8).astype(np.int64) + (lengths >= 12) + has(_BIT_UPPER) + has(_BIT_LOWER)
+                 + has(_BIT_DIGIT) + has(_BIT_SYMBOL))
+        ok = ((lengths >= 8) & has(_BIT_UPPER) & has(_BIT_LOWER) & has(_BIT_DIGIT)
+              & has(_BIT_PSYMBOL) & (allowed != 0))
+        score, ok = score.tolist(), ok.tolist()
+        for i in np.flatnonzero(exotic).tolist():
+            c = _classify(chunk[i])
+            score[i], ok[i] = strength_score(c), c[5]
+        scores.extend(score)
+        policy.extend(ok)
+    return scores, policy
+
+# Compressed wordlists are detected by content and decompressed while streaming
+WORDLIST_READ_BUFFER = 1 << 20
+_COMPRESSION_MAGIC = ((b"\x1f\x8b", "gzip"), (b"\xfd7zXZ\x00", "xz"),
+                      (b"BZh", "bz2"), (b"\x28\xb5\x2f\xfd", "zstd"))
+
+def open_wordlist_stream(path: str):
+    """Open a wordlist as a buffered binary stream, decompressing gzip/xz/bz2/zstd."""
+    raw = open(path, "rb", buffering=WORDLIST_READ_BUFFER)
+    head = raw.peek(8)[:8]
+    kind = next((k for magic, k in _COMPRESSION_MAGIC if head.startswith(magic)), None)
+    try:
+        if kind == "gzip":
+            import gzip
+            stream = gzip.GzipFile(fileobj=raw)
+        elif kind == "xz":
+            import lzma
+            stream = lzma.LZMAFile(raw)
+        elif kind == "bz2":
+            import bz2
+            stream = bz2.BZ2File(raw)
+        elif kind == "zstd":
+            import zstandard
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, read_size=WORDLIST_READ_BUFFER, closefd=True)
+        else:
+            return raw
+    except BaseException:
+        raw.close()
+        raise
+    return io.BufferedReader(stream, buffer_size=WORDLIST_READ_BUFFER)
+
+def iter_wordlist(path: str, max_lines: int = DEFAULT_MAX_WORDLIST_LINES):
+    """Yield normalized (stripped, lowercased) entries of a plain or compressed wordlist."""
+    if not path:
+        return
+    if not os.path.isfile(path):
+        log.warning("Wordlist not found: %s", path)
+        return
+    try:
+        stream = open_wordlist_stream(path)
+    except ImportError:
+        log.warning("Wordlist %s is zstd-compressed but the 'zstandard' package is not installed", path)
+        return
+    with io.TextIOWrapper(stream, encoding="latin-1", errors="ignore") as fh:
         for i, line in enumerate(fh):
             if max_lines and i >= max_lines: break
             w = line.strip().lower()
-            if w: wordset.add(w)
+            if w: yield w
+
+def load_wordlist(path: str, max_lines: int = DEFAULT_MAX_WORDLIST_LINES):
+    """Load a wordlist as a set, or mmap it if it is a compiled index or Bloom filter."""
+    from pw_wordlist import open_wordlist_index
+    with _metrics.stage("wordlist_load"):
+        index = open_wordlist_index(path) if path and os.path.isfile(path) else None
+        wordset = index if index is not None else set(iter_wordlist(path, max_lines))
     return wordset
 
-def contains_dictionary_word(password: str, wordset: set, min_len: int, exact_only: bool) -> bool:
+class DictionaryMatcher:
+    """Substring matcher compiled once per wordset.
+
+    Instead of scanning every dictionary word, probe only the password windows
+    whose lengths occur in the dictionary. A check costs a handful of set
+    lookups per password character, independent of the wordlist size.
+    """
+    def __init__(self, wordset):
+        self.words = wordset
+        self.lengths = sorted({len(w) for w in wordset})
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.words
+
+    def __iter__(self):
+        return iter(self.words)
+
+def as_matcher(wordset):
+    """Wrap a plain set in a DictionaryMatcher; precompiled backends pass through."""
+    if wordset is None or hasattr(wordset, "lengths"):
+        return wordset
+    return DictionaryMatcher(wordset)
+
+def _iter_windows(p: str, lengths):
+    n = len(p)
+    for size in lengths:
+        if size > n: break
+        for i in range(n - size + 1):
+            yield p[i:i + size]
+
+def find_dictionary_words(password: str, wordset, min_len: int):
+    """Yield every dictionary word (>= min_len) occurring in the password."""
+    if not wordset: return
+    p = password.lower()
+    lengths = getattr(wordset, "lengths", None)
+    if lengths is None:
+        lengths = range(max(min_len, 1), len(p) + 1)
+    else:
+        lengths = [n for n in lengths if n >= min_len]
+    for w in _iter_windows(p, lengths):
+        if w in wordset:
+            yield w
+
+def contains_dictionary_word(password: str, wordset, min_len: int, exact_only: bool) -> bool:
     if not wordset: return False
     p = password.lower()
     if p in wordset:  # exact
         return True
     if exact_only:    # substring off
         return False
-    for w in wordset:
-        if len(w) >= min_len and w in p:
-            return True
-    return False
+    return next(find_dictionary_words(p, wordset, min_len), None) is not None
 
-def validate_policy(password: str, username: str, wordset: set = None,
-                    min_dict_len: int = DEFAULT_MIN_DICT_LEN, exact_only: bool = False):
+# Leetspeak folding. Every character maps to one canonical letter, so a
+# password and a dictionary word that differ only by substitutions fold to the
+# same string and a single pass over the password covers every variant. The
+# ambiguous "l"/"1"/"i" all fold to "i".
+_LEET_DELEET = str.maketrans("4@83691!|05$7+2", "aabeggiiiossttz")
+_LEET_FOLD = str.maketrans("4@83691!|05$7+2l", "aabeggiiiossttzi")
+_leet_lock = threading.Lock()
+_leet_indexes = {}   # id(wordset) -> LeetIndex
+
+def leet_fold(s: str) -> str:
+    return s.lower().translate(_LEET_FOLD)
+
+class LeetIndex:
+    """Folded copy of a wordset, built once and probed like DictionaryMatcher.
+
+    With `base` (the index of an overlay's base set), only the overlay's
+    `extra` words are folded and the base index is probed as well.
+    """
+    def __init__(self, wordset, base=None):
+        self.size = len(wordset)
+        self.base = base
+        self.words = {leet_fold(w) for w in (wordset.extra if base is not None else wordset)}
+        self.lengths = sorted({len(w) for w in self.words}.union(base.lengths if base is not None else ()))
+
+    def __len__(self):
+        return len(self.words) + (len(self.base) if self.base is not None else 0)
+
+    def __contains__(self, word):
+        return word in self.words or (self.base is not None and word in self.base)
+
+def leet_index(wordset):
+    """LeetIndex for `wordset`, cached until the wordset is garbage collected.
+
+    Returns None for backends that cannot be enumerated (Bloom filters).
+    """
+    if not hasattr(wordset, "__iter__"):
+        return None
+    key = id(wordset)
+    idx = _leet_indexes.get(key)
+    if idx is not None and idx.size == len(wordset):
+        return idx
+    # An appended-to wordset (pw_wordlist.OverlayMatcher) extends its base's index
+    base = leet_index(wordset.base) if hasattr(wordset, "extra") else None
+    with _leet_lock:
+        idx = _leet_indexes.get(key)
+        if idx is None or idx.size != len(wordset):
+            with _metrics.stage("leet_index"):
+                idx = LeetIndex(wordset, base)
+            if key not in _leet_indexes:
+                weakref.finalize(wordset, _leet_indexes.pop, key, None)
+            _leet_indexes[key] = idx
+    return idx
+
+def contains_leet_word(password: str, wordset, min_len: int, exact_only: bool) -> bool:
+    """Like contains_dictionary_word, but also matching leetspeak variants."""
+    if not wordset: return False
+    if contains_dictionary_word(password, wordset, min_len, exact_only):
+        return True
+    idx = leet_index(wordset)
+    if idx is None:
+        # Opaque backend: probe the single most likely de-leeted spelling
+        return contains_dictionary_word(password.lower().translate(_LEET_DELEET), wordset, min_len, exact_only)
+    return contains_dictionary_word(leet_fold(password), idx, min_len, exact_only)
+
+# Rule identifiers reported by check_policy, with their user-facing messages
+POLICY_MESSAGES = {
+    "min_length": "Password must be at least 8 characters long.",
+    "username": "Password must not contain the username.",
+    "common": "Password is too common.",
+    "dictionary": "Password contains dictionary word(s).",
+    "charset": "Password must include uppercase, lowercase, digit, and symbol.",
+    "reused": "Password was used before; choose a new one.",
+    "breached": "Password appears in a known data breach.",
+    "similar": "Password is too similar to a dictionary word.",
+}
+ACCEPTED_MESSAGE = "Password meets all requirements."
+
+def _first_failed_rule(password, username, wordset, min_dict_len, exact_only, history, executor, leet, breach, fuzzy):
     if len(password) < 8:
-        return False, "Password must be at least 8 characters long."
+        return "min_length"
     if username and username.strip() and username.lower() in password.lower():
-        return False, "Password must not contain the username."
+        return "username"
     if password.lower() in COMMON_PASSWORDS:
-        return False, "Password is too common."
-    if wordset and contains_dictionary_word(password, wordset, min_dict_len, exact_only):
-        return False, "Password contains dictionary word(s)."
-    if not meets_regex_policy(password):
-        return False, "Password must include uppercase, lowercase, digit, and symbol."
-    return True, "Password meets all requirements."
+        return "common"
+    if wordset:
+        with _metrics.stage("dictionary"):
+            match = contains_leet_word if leet else contains_dictionary_word
+            hit = match(password, wordset, min_dict_len, exact_only)
+        if hit:
+            return "dictionary"
+    if fuzzy is not None:
+        with _metrics.stage("fuzzy"):
+            hit = fuzzy.contains(password, exact_only)
+        if hit:
+            return "similar"
+    if breach is not None:
+        with _metrics.stage("breach"):
+            hit = password in breach
+        if hit:
+            return "breached"
+    with _metrics.stage("regex"):
+        ok = meets_regex_policy(password)
+    if not ok:
+        return "charset"
+    if history:
+        with _metrics.stage("history"):
+            reused = password_in_history(password, history, executor)
+        if reused:
+            return "reused"
+    return None
+
+def check_policy(password: str, username: str, wordset: set = None,
+                 min_dict_len: int = DEFAULT_MIN_DICT_LEN, exact_only: bool = False,
+                 history=None, executor=None, leet: bool = False, breach=None, fuzzy=None):
+    """Return the id of the first failed rule (None if accepted) and its message.
+
+    `history` is an optional list of the user's earlier hashes; they are
+    verified concurrently on `executor` (a HashExecutor) as the last stage.
+    With `leet`, the dictionary rule also catches substitutions like P@ssw0rd.
+    `breach` is an optional pw_breach.BreachDump (anything supporting `in`),
+    `fuzzy` an optional pw_fuzzy.FuzzyIndex for near-misses of dictionary words.
+    """
+    with _metrics.stage("policy"):
+        rule = _first_failed_rule(password, username, wordset, min_dict_len, exact_only, history, executor,
+                                  leet, breach, fuzzy)
+    if rule is None:
+        _metrics.inc("pw_checks_total", result="accepted")
+        return None, ACCEPTED_MESSAGE
+    _metrics.inc("pw_checks_total", result="rejected")
+    _metrics.inc("pw_rejections_total", rule=rule)
+    return rule, POLICY_MESSAGES[rule]
+
+def validate_policy(password: str, username: str, wordset: set = None,
+                    min_dict_len: int = DEFAULT_MIN_DICT_LEN, exact_only: bool = False,
+                    history=None, executor=None, leet: bool = False, breach=None, fuzzy=None):
+    rule, msg = check_policy(password, username, wordset, min_dict_len, exact_only, history, executor, leet, breach,
+                             fuzzy)
+    return rule is None, msg
+
+# Hashing: Argon2 preferred, bcrypt fallback. The backends are imported on
+# first use, so callers that never hash (rejections, --show-hashes) skip them.
+# Cost parameters come from a JSON file written by pw_calibrate.py: the path
+# given to load_hash_config(), else $PW_HASH_CONFIG, else ./pw_hash_params.json.
+HASH_CONFIG_ENV = "PW_HASH_CONFIG"
+DEFAULT_HASH_CONFIG = "pw_hash_params.json"
+ARGON2_DEFAULTS = {"time_cost": 2, "memory_cost": 102400, "parallelism": 4}   # memory_cost in KiB
+BCRYPT_DEFAULT_ROUNDS = 12
+
+_ph = None
+_hash_config = None
+
+def load_hash_config(path: str = None) -> dict:
+    """Read and apply hashing parameters; returns {"argon2", "bcrypt", "hash_workers", "path"}.
+
+    A missing file means built-in defaults; an unreadable one is logged and ignored.
+    """
+    global _hash_config, _ph
+    path = path or os.environ.get(HASH_CONFIG_ENV) or DEFAULT_HASH_CONFIG
+    cfg = {"argon2": dict(ARGON2_DEFAULTS), "bcrypt": {"rounds": BCRYPT_DEFAULT_ROUNDS},
+           "hash_workers": None, "path": None}
+    try:
+        import json
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        argon2 = {k: int(v) for k, v in data.get("argon2", {}).items() if k in ARGON2_DEFAULTS}
+        rounds = int(data.get("bcrypt", {}).get("rounds", BCRYPT_DEFAULT_ROUNDS))
+        if min(argon2.values(), default=1) < 1 or not 4 <= rounds <= 31:
+            raise ValueError("cost parameters out of range")
+        workers = data.get("hash_workers")
+        cfg["argon2"].update(argon2)
+        cfg["bcrypt"]["rounds"] = rounds
+        cfg["hash_workers"] = int(workers) if workers else None
+        cfg["path"] = path
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        log.warning("Ignoring hash config %s (%s); using default cost parameters", path, e)
+    _hash_config = cfg
+    _ph = None
+    return cfg
+
+def hash_config() -> dict:
+    """The active hashing parameters, loading the default config file on first use."""
+    return _hash_config or load_hash_config()
+
+def _hasher():
+    """The shared Argon2 PasswordHasher, or None if argon2-cffi is unavailable."""
+    global _ph
+    if _ph is None:
+        try:
+            from argon2 import PasswordHasher
+            _ph = PasswordHasher(**hash_config()["argon2"])
+        except Exception:
+            _ph = False
+    return _ph or None
 
 def hash_password(password: str) -> str:
-    if _HAS_ARGON2:
-        return PH.hash(password)
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+    with _metrics.stage("hash"):
+        ph = _hasher()
+        if ph:
+            return ph.hash(password)
+        import bcrypt
+        salt = bcrypt.gensalt(rounds=hash_config()["bcrypt"]["rounds"])
+        return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+def verify_password(password: str, hashed: str) -> bool:
+    """Check a password against a stored Argon2 or bcrypt hash."""
+    with _metrics.stage("verify"):
+        if hashed.startswith("$argon2"):
+            ph = _hasher()
+            if not ph:
+                log.warning("Cannot verify Argon2 hash: argon2-cffi is not installed")
+                return False
+            from argon2.exceptions import VerificationError, InvalidHashError
+            try:
+                return ph.verify(hashed, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        if hashed.startswith(("$2a$", "$2b$", "$2y$")):
+            import bcrypt
+            try:
+                return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+            except ValueError:
+                return False
+        return False
+
+def password_in_history(password: str, hashes, executor=None) -> bool:
+    """True if the password matches any of `hashes`.
+
+    Hashes are verified concurrently on `executor` (a HashExecutor, sharing its
+    memory bound with hashing) and the first match wins, so the wall time stays
+    close to one verification when the pool has enough workers.
+    """
+    hashes = [h for h in hashes if h]
+    if not hashes:
+        return False
+    if executor is None or len(hashes) == 1:
+        return any(verify_password(password, h) for h in hashes)
+    from concurrent.futures import FIRST_COMPLETED, wait
+    pending = set()
+    try:
+        # Submit one at a time so a HashBusy partway through still cancels what was queued
+        for h in hashes:
+            pending.add(executor.run(verify_password, password, h))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if any(f.result() for f in done):
+                return True
+        return False
+    finally:
+        for f in pending:
+            f.cancel()
+
+class HashBusy(RuntimeError):
+    """Raised when the hashing pool cannot admit another job in time."""
+
+class HashExecutor:
+    """Bounded worker pool for hash_password.
+
+    At most `workers` hashes run at once (each Argon2 hash allocates
+    memory_cost KiB) and at most `queue_depth` more may wait. Callers block up
+    to `timeout` seconds for a slot, then get HashBusy. Argon2 and bcrypt
+    release the GIL, so threads hash in parallel.
+    """
+    def __init__(self, workers: int = 2, queue_depth: int = 8, timeout: float = 5.0):
+        self.workers = max(1, workers)
+        self.queue_depth = max(0, queue_depth)
+        self.timeout = timeout
+        from concurrent.futures import ThreadPoolExecutor
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pw-hash")
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_depth)
+
+    def run(self, fn, *args):
+        """Submit any hashing-sized job (hash or verify) under the pool's admission limit."""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HashBusy("hashing queue is full")
+        try:
+            fut = self._pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        fut.add_done_callback(lambda _: self._slots.release())
+        return fut
+
+    def submit(self, password: str):
+        return self.run(hash_password, password)
+
+    def hash(self, password: str) -> str:
+        return self.submit(password).result()
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
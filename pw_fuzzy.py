@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Fuzzy dictionary matching for PW Enforcer (SymSpell-style deletes index).
+
+Catches near-misses of dictionary words, e.g. `passwrod` (transposition) or
+`dragom` (substitution), within a small edit distance k. Every dictionary word
+is indexed under each string obtained by deleting up to k characters from its
+prefix; a candidate is looked up under its own deletes and the few words found
+are verified with an optimal-string-alignment (Damerau) distance. A check
+costs a few hundred dict lookups instead of a pass over the whole wordlist.
+
+Indexes are built in memory from a loaded wordlist, or saved once as a
+read-only file (.pwfz) that is mmapped and shared between processes.
+
+Usage:
+  python pw_fuzzy.py build wordlists/jack_the_reaper.txt wordlists/jack.pwfz -k 1 --min-len 6
+  python pw_fuzzy.py query wordlists/jack.pwfz passwrod
+"""
+import os, sys, mmap, struct, bisect, argparse, logging, threading, weakref
+
+from pw_core import load_wordlist, DEFAULT_MAX_WORDLIST_LINES
+import pw_metrics as _metrics
+
+log = logging.getLogger("pw_fuzzy")
+
+DEFAULT_MAX_DISTANCE = 1
+DEFAULT_FUZZY_MIN_LEN = 6
+DEFAULT_PREFIX_LEN = 7
+ENCODING = "latin-1"
+
+# File layout (little-endian):
+#   header  : magic(8) | k (u32) | min_len (u32) | prefix_len (u32) | word count (u32) | bucket count (u32)
+#             | distinct word lengths (u32), then those lengths (u32 each, ascending)
+#   words   : (word count + 1) u64 offsets into the blob, then the latin-1 word blob
+#   buckets : (key length u32, record count u32, data offset u64) per bucket
+#   data    : per bucket, sorted fixed-width records of key bytes + word id (u32)
+FUZZY_MAGIC = b"PWFZ\x01\x00\x00\x00"
+_HEADER = struct.Struct("<8sIIIIII")
+_BUCKET = struct.Struct("<IIQ")
+_ID = struct.Struct("<I")
+
+def deletes(s: str, k: int) -> set:
+    """`s` and every string obtained by deleting up to k of its characters."""
+    out = frontier = {s}
+    for _ in range(k):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        out = out | frontier
+    return out
+
+def osa_distance(a: str, b: str, k: int):
+    """Optimal string alignment distance (edits plus adjacent swaps) if <= k, else None."""
+    la, lb = len(a), len(b)
+    if abs(la - lb) > k:
+        return None
+    if a == b:
+        return 0
+    prev2, prev = None, list(range(lb + 1))
+    for i in range(1, la + 1):
+        ca = a[i - 1]
+        cur = [i] + [0] * lb
+        best = i
+        for j in range(1, lb + 1):
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != b[j - 1]))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == b[j - 1] and prev2[j - 2] + 1 < v:
+                v = prev2[j - 2] + 1
+            cur[j] = v
+            if v < best:
+                best = v
+        if best > k:
+            return None
+        prev2, prev = prev, cur
+    return prev[lb] if prev[lb] <= k else None
+
+class FuzzyIndex:
+    """Deletes index over the words of a wordset that are at least `min_len` long.
+
+    With `base`, only `words` are indexed here and lookups search `base` too,
+    so words appended to a list extend its index without rebuilding it.
+    """
+
+    def __init__(self, words=(), max_distance: int = DEFAULT_MAX_DISTANCE,
+                 min_len: int = DEFAULT_FUZZY_MIN_LEN, prefix_len: int = DEFAULT_PREFIX_LEN, base=None):
+        if base is not None:
+            max_distance, min_len, prefix_len = base.k, base.min_len, base.prefix_len
+        if min_len <= max_distance:
+            raise ValueError("min_len must be greater than the max distance")
+        self.k, self.min_len, self.prefix_len = max_distance, min_len, max(prefix_len, max_distance + 1)
+        self.base = base
+        self._words = []
+        self._table = {}   # delete -> word id, or tuple of ids
+        table = self._table
+        for w in words:
+            if len(w) < min_len:
+                continue
+            wid = len(self._words)
+            self._words.append(w)
+            for d in deletes(w[:self.prefix_len], self.k):
+                old = table.get(d)
+                table[d] = wid if old is None else (old + (wid,) if isinstance(old, tuple) else (old, wid))
+        self.lengths = sorted({len(w) for w in self._words}.union(base.lengths if base is not None else ()))
+
+    def __len__(self):
+        return len(self._words) + (len(self.base) if self.base is not None else 0)
+
+    def word(self, wid: int) -> str:
+        return self._words[wid]
+
+    def _ids(self, key: str):
+        hit = self._table.get(key)
+        if hit is None:
+            return ()
+        return hit if isinstance(hit, tuple) else (hit,)
+
+    def lookup(self, candidate: str):
+        """Yield (word, distance) for indexed words within k edits of `candidate`."""
+        if self.base is not None:
+            yield from self.base.lookup(candidate)
+        seen = set()
+        for d in deletes(candidate[:self.prefix_len], self.k):
+            for wid in self._ids(d):
+                if wid in seen:
+                    continue
+                seen.add(wid)
+                w = self.word(wid)
+                dist = osa_distance(candidate, w, self.k)
+                if dist is not None:
+                    yield w, dist
+
+    def _windows(self, p: str, whole_only: bool):
+        if whole_only or not self.lengths:
+            yield p
+            return
+        lo, hi = max(self.min_len - self.k, 1), min(self.lengths[-1] + self.k, len(p))
+        for size in range(lo, hi + 1):
+            for i in range(len(p) - size + 1):
+                yield p[i:i + size]
+
+    def find(self, password: str, whole_only: bool = False):
+        """Yield (window, word, distance) for near-misses in the password.
+
+        Every window of a plausible length is checked unless `whole_only`, in
+        which case only the whole (lowercased) password is.
+        """
+        p = password.lower()
+        for window in self._windows(p, whole_only):
+            for w, dist in self.lookup(window):
+                yield window, w, dist
+
+    def contains(self, password: str, whole_only: bool = False) -> bool:
+        return next(self.find(password, whole_only), None) is not None
+
+    def save(self, dest: str):
+        """Write the index as an mmappable .pwfz file."""
+        if self.base is not None:
+            raise ValueError("cannot save an index layered over a base index")
+        blob = [w.encode(ENCODING, "replace") for w in self._words]
+        offsets, pos = [], 0
+        for b in blob:
+            offsets.append(pos)
+            pos += len(b)
+        offsets.append(pos)
+        buckets = {}
+        for key, hit in self._table.items():
+            kb = key.encode(ENCODING, "replace")
+            recs = buckets.setdefault(len(kb), [])
+            for wid in (hit if isinstance(hit, tuple) else (hit,)):
+                recs.append(kb + _ID.pack(wid))
+        sizes = sorted(buckets)
+        data_at = _HEADER.size + 4 * len(self.lengths) + 8 * len(offsets) + pos + _BUCKET.size * len(sizes)
+        table = []
+        for size in sizes:
+            table.append(_BUCKET.pack(size, len(buckets[size]), data_at))
+            data_at += (size + _ID.size) * len(buckets[size])
+        tmp = f"{dest}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as out:
+            out.write(_HEADER.pack(FUZZY_MAGIC, self.k, self.min_len, self.prefix_len, len(blob), len(sizes),
+                                   len(self.lengths)))
+            out.write(struct.pack(f"<{len(self.lengths)}I", *self.lengths))
+            out.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            out.write(b"".join(blob))
+            out.write(b"".join(table))
+            for size in sizes:
+                out.write(b"".join(sorted(buckets[size])))
+        os.replace(tmp, dest)
+
+    @staticmethod
+    def load(path: str):
+        return MappedFuzzyIndex(path)
+
+class _Keys:
+    """Key part of one bucket's sorted records, viewed in place for bisect."""
+    __slots__ = ("mm", "size", "width", "count", "offset")
+
+    def __init__(self, mm, size, count, offset):
+        self.mm, self.size, self.width, self.count, self.offset = mm, size, size + _ID.size, count, offset
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        start = self.offset + i * self.width
+        return self.mm[start:start + self.size]
+
+class MappedFuzzyIndex(FuzzyIndex):
+    """A saved FuzzyIndex, mmapped read-only."""
+
+    base = None
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.k, self.min_len, self.prefix_len, nwords, nbuckets, nlengths = _HEADER.unpack_from(self._mm, 0)
+        if magic != FUZZY_MAGIC:
+            raise ValueError(f"{path}: not a fuzzy index")
+        # Word lengths are stored at build time, so opening does not walk every word
+        self.lengths = list(struct.unpack_from(f"<{nlengths}I", self._mm, _HEADER.size))
+        self._nwords = nwords
+        self._offsets_at = _HEADER.size + 4 * nlengths
+        self._blob_at = self._offsets_at + 8 * (nwords + 1)
+        blob_len = struct.unpack_from("<Q", self._mm, self._offsets_at + 8 * nwords)[0]
+        table_at = self._blob_at + blob_len
+        self._buckets = {}
+        for i in range(nbuckets):
+            size, count, offset = _BUCKET.unpack_from(self._mm, table_at + i * _BUCKET.size)
+            self._buckets[size] = _Keys(self._mm, size, count, offset)
+
+    def __len__(self):
+        return self._nwords
+
+    def word(self, wid: int) -> str:
+        start, end = struct.unpack_from("<QQ", self._mm, self._offsets_at + 8 * wid)
+        return self._mm[self._blob_at + start:self._blob_at + end].decode(ENCODING)
+
+    def _ids(self, key: str):
+        try:
+            kb = key.encode(ENCODING)
+        except UnicodeEncodeError:
+            return ()
+        keys = self._buckets.get(len(kb))
+        if keys is None:
+            return ()
+        ids = []
+        i = bisect.bisect_left(keys, kb)
+        while i < keys.count and keys[i] == kb:
+            ids.append(_ID.unpack_from(keys.mm, keys.offset + i * keys.width + keys.size)[0])
+            i += 1
+        return ids
+
+    def close(self):
+        self._mm.close()
+
+_lock = threading.Lock()
+_indexes = {}   # (id(wordset), k, min_len) -> FuzzyIndex
+
+def fuzzy_index(wordset, max_distance: int = DEFAULT_MAX_DISTANCE, min_len: int = DEFAULT_FUZZY_MIN_LEN,
+                prebuilt=None):
+    """FuzzyIndex for `wordset`, built once and cached until the wordset is garbage collected.
+
+    `prebuilt` (e.g. a loaded .pwfz) is cached for `wordset` instead of
+    building one. An appended-to wordset (pw_wordlist.OverlayMatcher) only
+    indexes its new words on top of its base's index. Returns None for an
+    empty wordset or one that cannot be enumerated (Bloom filters).
+    """
+    if not wordset or not hasattr(wordset, "__iter__"):
+        return None
+    key = (id(wordset), max_distance, min_len)
+    idx = _indexes.get(key)
+    if idx is not None:
+        return idx
+    base = fuzzy_index(wordset.base, max_distance, min_len) if prebuilt is None and hasattr(wordset, "extra") else None
+    with _lock:
+        idx = _indexes.get(key)
+        if idx is None:
+            with _metrics.stage("fuzzy_index"):
+                if prebuilt is not None:
+                    idx = prebuilt
+                elif base is not None:
+                    idx = FuzzyIndex(wordset.extra, base=base)
+                else:
+                    idx = FuzzyIndex(wordset, max_distance, min_len)
+            _indexes[key] = idx
+            weakref.finalize(wordset, _indexes.pop, key, None)
+    return idx
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="PW Enforcer fuzzy index tools")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    bp = sub.add_parser("build", help="Build a .pwfz fuzzy index from a wordlist")
+    bp.add_argument("src", help="Wordlist (plain, compressed or compiled)")
+    bp.add_argument("dest", help="Output path (e.g. wordlists/jack.pwfz)")
+    bp.add_argument("-k", "--max-distance", type=int, default=DEFAULT_MAX_DISTANCE, help="Max edit distance")
+    bp.add_argument("--min-len", type=int, default=DEFAULT_FUZZY_MIN_LEN, help="Shortest word indexed")
+    bp.add_argument("--prefix-len", type=int, default=DEFAULT_PREFIX_LEN, help="Word prefix the deletes are taken from")
+    bp.add_argument("--max-lines", "-m", type=int, default=DEFAULT_MAX_WORDLIST_LINES,
+                    help="Max lines to read from the source (0 = all)")
+
+    qp = sub.add_parser("query", help="List dictionary words near each given password")
+    qp.add_argument("index", help=".pwfz index")
+    qp.add_argument("password", nargs="+")
+    qp.add_argument("--whole", action="store_true", help="Match the whole password only, not its substrings")
+
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "build":
+        if not os.path.isfile(args.src):
+            ap.error(f"wordlist not found: {args.src}")
+        idx = FuzzyIndex(load_wordlist(args.src, args.max_lines), args.max_distance, args.min_len, args.prefix_len)
+        idx.save(args.dest)
+        log.info("Indexed %s words (k=%d, min length %d) into %s", f"{len(idx):,}", idx.k, idx.min_len, args.dest)
+    elif args.command == "query":
+        idx = FuzzyIndex.load(args.index)
+        for password in args.password:
+            near = {}
+            for _, w, d in idx.find(password, args.whole):
+                near[w] = min(d, near.get(w, d))
+            print(f"{password}: " + (", ".join(f"{w} ({d})" for w, d in sorted(near.items(), key=lambda h: (h[1], h[0])))
+                                     or "-"))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
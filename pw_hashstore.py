@@ -0,0 +1,444 @@
+"""
+Hash file storage for PW Enforcer.
+
+`username:hash` lines are appended under an exclusive file lock with a single
+write() per batch, so concurrent threads and processes never interleave
+partial lines. HashFileWriter adds group commit: appends from many request
+threads that arrive together are written, and optionally fsynced, as one
+batch by a background thread.
+
+HashIndex keeps a SQLite (WAL) sidecar, `<hash file>.idx`, of line offsets
+and usernames. "Last N", per-user and paged reads then cost a few block reads
+however long the file grows. The index catches up incrementally with lines
+appended by any writer, so the text file stays the source of truth.
+
+Usage:
+  python pw_hashstore.py migrate ./password_hashes.txt   # build/refresh the index
+"""
+import os, sys, queue, atexit, sqlite3, argparse, logging, threading, time
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows: rely on O_APPEND only
+    fcntl = None
+
+log = logging.getLogger("pw_hashstore")
+
+FSYNC_POLICIES = ("commit", "interval", "none")
+DEFAULT_FSYNC_INTERVAL = 1.0
+
+def _open_append(path: str) -> int:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+    try:
+        os.chmod(path, 0o600)
+    except OSError:
+        pass
+    return fd
+
+def _locked_write(fd: int, data: bytes, sync: bool):
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+        if sync:
+            os.fsync(fd)
+    finally:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+def append_lines(path: str, lines, fsync: bool = False):
+    """Append lines to the hash file in one locked write (no background thread)."""
+    fd = _open_append(path)
+    try:
+        _locked_write(fd, "".join(lines).encode("utf-8"), fsync)
+    finally:
+        os.close(fd)
+
+class HashFileWriter:
+    """Group-commit appender for one hash file.
+
+    append() enqueues lines and blocks until the batch containing them is
+    written. The writer thread drains up to `max_batch` pending appends, or
+    waits up to `max_delay` seconds for more, and writes them with one locked
+    write(). fsync policy: "commit" syncs every batch, "interval" at most
+    every `fsync_interval` seconds (and within that long of the last write,
+    even if no more appends arrive), "none" leaves it to the OS.
+    """
+
+    def __init__(self, path: str, fsync: str = "commit", max_batch: int = 1024,
+                 max_delay: float = 0.002, fsync_interval: float = DEFAULT_FSYNC_INTERVAL):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync policy must be one of {FSYNC_POLICIES}")
+        self.path = path
+        self.fsync = fsync
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.fsync_interval = fsync_interval
+        self.batches = self.lines_written = 0
+        self._queue = queue.SimpleQueue()
+        self._fd = None
+        self._last_sync = time.monotonic()
+        self._dirty = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="pw-hashwriter", daemon=True)
+        self._thread.start()
+
+    def append(self, lines, timeout: float = None):
+        """Append lines (a string or list of strings); re-raises the error if the write failed."""
+        if isinstance(lines, str):
+            lines = [lines]
+        job = [lines, threading.Event(), None]
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._queue.put(job)
+        if closed:
+            # Evicted by get_writer while the caller held it: write directly
+            append_lines(self.path, lines, self.fsync != "none")
+            return
+        if not job[1].wait(timeout):
+            raise TimeoutError("hash file commit timed out")
+        if job[2] is not None:
+            raise job[2]
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _reopen_if_rotated(self):
+        # Keep the fd across batches, but follow the path if the file was moved or removed
+        if self._fd is not None:
+            try:
+                st = os.stat(self.path)
+                fst = os.fstat(self._fd)
+                if (st.st_ino, st.st_dev) == (fst.st_ino, fst.st_dev):
+                    return
+            except OSError:
+                pass
+            os.close(self._fd)
+            self._fd = None
+        self._fd = _open_append(self.path)
+
+    def _run(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=self._sync_due())
+            except queue.Empty:
+                # Interval policy: sync the last writes once the interval is up, even when idle
+                self._sync()
+                continue
+            if job is None:
+                break
+            batch = [job]
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    nxt = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._commit(batch)
+            if stop:
+                break
+        if self._fd is not None:
+            if self.fsync != "none":
+                os.fsync(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    def _sync_due(self):
+        # Seconds until unsynced writes must be fsynced, or None to wait indefinitely
+        if not self._dirty:
+            return None
+        return max(0.0, self._last_sync + self.fsync_interval - time.monotonic())
+
+    def _sync(self):
+        try:
+            if self._fd is not None:
+                os.fsync(self._fd)
+        except OSError as e:
+            log.warning("fsync of %s failed: %s", self.path, e)
+        self._last_sync = time.monotonic()
+        self._dirty = False
+
+    def _commit(self, batch):
+        error = None
+        try:
+            self._reopen_if_rotated()
+            now = time.monotonic()
+            sync = self.fsync == "commit" or (self.fsync == "interval" and now - self._last_sync >= self.fsync_interval)
+            _locked_write(self._fd, "".join(ln for job in batch for ln in job[0]).encode("utf-8"), sync)
+            if sync:
+                self._last_sync = now
+            self._dirty = self.fsync == "interval" and not sync
+            self.batches += 1
+            self.lines_written += sum(len(job[0]) for job in batch)
+        except Exception as e:
+            log.exception("Failed writing hash batch to %s: %s", self.path, e)
+            error = e
+        for job in batch:
+            job[2] = error
+            job[1].set()
+
+MAX_OPEN_WRITERS = 16
+_writers = OrderedDict()
+_writers_lock = threading.Lock()
+
+def get_writer(path: str, fsync: str = "commit") -> HashFileWriter:
+    """Process-wide writer per hash file, so all request threads share one commit queue.
+
+    The most recently used MAX_OPEN_WRITERS stay open; evicted writers are
+    flushed and closed.
+    """
+    key = (os.path.realpath(path), fsync)
+    evicted = []
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = HashFileWriter(path, fsync=fsync)
+            while len(_writers) > MAX_OPEN_WRITERS:
+                evicted.append(_writers.popitem(last=False)[1])
+        else:
+            _writers.move_to_end(key)
+    # Closing joins the writer thread, so do it outside the lock
+    for old in evicted:
+        old.close()
+    return writer
+
+@atexit.register
+def close_writers():
+    with _writers_lock:
+        for writer in _writers.values():
+            writer.close()
+        _writers.clear()
+
+INDEX_SUFFIX = ".idx"
+_INDEX_READ_BLOCK = 1 << 20
+
+def split_entry(line: str):
+    """Split a `username:hash` line; hashes never contain ':' so usernames may."""
+    username, sep, hashed = line.rstrip("\r\n").rpartition(":")
+    return (username, hashed) if sep else ("", hashed)
+
+def tail_lines(path: str, count: int, block: int = 8192):
+    """Last `count` lines of a file, reading backwards in blocks (index-free fallback)."""
+    with open(path, "rb") as fh:
+        fh.seek(0, os.SEEK_END)
+        pos = fh.tell()
+        data = b""
+        while pos > 0 and data.count(b"\n") <= count:
+            step = min(block, pos)
+            pos -= step
+            fh.seek(pos)
+            data = fh.read(step) + data
+    lines = data.decode("utf-8", errors="replace").splitlines()
+    return lines[-count:] if count else []
+
+def head_lines(path: str, count: int):
+    """First `count` lines of a file and whether more follow (index-free fallback)."""
+    lines = []
+    with open(path, "r", encoding="utf-8", errors="replace") as fh:
+        for ln in fh:
+            if len(lines) == count:
+                return lines, True
+            lines.append(ln.rstrip("\r\n"))
+    return lines, False
+
+class HashIndex:
+    """Offset/username index over a `username:hash` append log.
+
+    Row ids are line numbers (from 1), so pages are id ranges. Syncs from
+    several processes serialize on SQLite's write lock and re-read the
+    indexed size inside it, so no tail is indexed twice.
+    """
+    def __init__(self, path: str, index_path: str = None):
+        self.path = path
+        self.index_path = index_path or path + INDEX_SUFFIX
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.index_path, check_same_thread=False, isolation_level=None, timeout=30)
+        try:
+            os.chmod(self.index_path, 0o600)
+        except OSError:
+            pass
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entries (id INTEGER PRIMARY KEY, offset INTEGER NOT NULL, "
+                         "length INTEGER NOT NULL, username TEXT NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_username ON entries (username, id)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+
+    def close(self):
+        self._db.close()
+
+    def _meta(self, key, default=0):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def sync(self) -> int:
+        """Index lines appended since the last sync; rebuilds if the file was replaced or truncated."""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                st = None
+            if st is not None and (st.st_ino, st.st_size) == (self._meta("inode"), self._meta("indexed_size")):
+                return 0  # up to date; nothing to lock
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                added = self._sync_locked()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return added
+
+    def _sync_locked(self) -> int:
+        # Inside the write transaction: another process may have indexed since our first look
+        try:
+            fh = open(self.path, "rb")
+        except FileNotFoundError:
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("DELETE FROM meta")
+            return 0
+        with fh:
+            # Writers append whole batches under LOCK_EX, so a size seen under LOCK_SH ends on a record
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_SH)
+            st = os.fstat(fh.fileno())
+            if fcntl:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+            indexed, lines = self._meta("indexed_size"), self._meta("lines")
+            if st.st_ino != self._meta("inode") or st.st_size < indexed:
+                self._db.execute("DELETE FROM entries")
+                indexed = lines = 0
+            if st.st_size == indexed:
+                return 0
+            fh.seek(indexed)
+            remaining = st.st_size - indexed
+            pending = b""
+            offset = indexed
+            added = 0
+            while remaining:
+                chunk = fh.read(min(_INDEX_READ_BLOCK, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                pending += chunk
+                # The last record is indexed even without a trailing newline
+                end = len(pending) if not remaining else pending.rfind(b"\n") + 1
+                rows = []
+                for raw in pending[:end].splitlines(keepends=True):
+                    lines += 1
+                    username, _ = split_entry(raw.decode("utf-8", errors="replace"))
+                    rows.append((lines, offset, len(raw), username))
+                    offset += len(raw)
+                self._db.executemany("INSERT INTO entries (id, offset, length, username) VALUES (?, ?, ?, ?)", rows)
+                added += len(rows)
+                pending = pending[end:]
+        self._db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                             [("indexed_size", offset), ("lines", lines), ("inode", st.st_ino)])
+        return added
+
+    def _read(self, rows):
+        """Read the lines at (offset, length) rows; contiguous rows cost one read."""
+        if not rows:
+            return []
+        rows = sorted(rows)
+        out = []
+        with open(self.path, "rb") as fh:
+            start, end = rows[0][0], rows[0][0]
+            group = []
+            for off, length in rows + [(None, None)]:
+                if off is not None and off == end:
+                    group.append(length)
+                    end += length
+                    continue
+                fh.seek(start)
+                data = fh.read(end - start)
+                pos = 0
+                for n in group:
+                    out.append(data[pos:pos + n].decode("utf-8", errors="replace").rstrip("\r\n"))
+                    pos += n
+                if off is not None:
+                    start, end, group = off, off + length, [length]
+        return out
+
+    def _query(self, sql, args=()):
+        self.sync()
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def count(self) -> int:
+        return self._query("SELECT COUNT(*) FROM entries")[0][0]
+
+    def tail(self, count: int):
+        """Last `count` lines, oldest first."""
+        return self._read(self._query("SELECT offset, length FROM entries ORDER BY id DESC LIMIT ?", (count,)))
+
+    def page(self, start: int, count: int):
+        """Lines [start, start + count) in file order."""
+        # ids are line numbers from 1, so a page is a rowid range lookup
+        return self._read(self._query("SELECT offset, length FROM entries WHERE id > ? AND id <= ? ORDER BY id",
+                                      (start, start + count)))
+
+    def entries_for(self, username: str, limit: int = None):
+        """Hashes stored for `username`, newest first."""
+        rows = self._query("SELECT offset, length FROM entries WHERE username = ? ORDER BY id DESC LIMIT ?",
+                           (username, -1 if limit is None else limit))
+        return [split_entry(ln)[1] for ln in reversed(self._read(rows))]
+
+MAX_OPEN_INDEXES = 16
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+def get_index(path: str, create: bool = True):
+    """Process-wide HashIndex per hash file (the most recently used MAX_OPEN_INDEXES stay open).
+
+    With create=False, returns None rather than creating a missing sidecar.
+    """
+    key = os.path.realpath(path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            if not create and not os.path.isfile(path + INDEX_SUFFIX):
+                return None
+            index = _indexes[key] = HashIndex(path)
+            # Evicted indexes close when their last in-flight user drops them
+            while len(_indexes) > MAX_OPEN_INDEXES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(key)
+        return index
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="PW Enforcer hash store tools")
+    sub = ap.add_subparsers(dest="command", required=True)
+    mp = sub.add_parser("migrate", help="Build or refresh the offset/username index for a username:hash file")
+    mp.add_argument("hash_file", help="Hash file (e.g. ./password_hashes.txt)")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "migrate":
+        if not os.path.isfile(args.hash_file):
+            ap.error(f"hash file not found: {args.hash_file}")
+        index = HashIndex(args.hash_file)
+        added = index.sync()
+        log.info("Indexed %s new entries (%s total) into %s", f"{added:,}", f"{index.count():,}", index.index_path)
+        index.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
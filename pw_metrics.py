@@ -0,0 +1,126 @@
+"""
+Optional hot-path instrumentation for PW Enforcer.
+
+Off by default: stage() then returns a shared no-op context manager and the
+counters are never touched, so instrumented code pays one function call.
+Once enabled, per-stage latency histograms and labelled counters are
+recorded in-process. They can be rendered as Prometheus text or as a short
+human-readable summary.
+"""
+import time, threading
+from contextlib import nullcontext
+
+# Latency histogram bucket upper bounds, in seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+enabled = False
+_NULL = nullcontext()
+_lock = threading.Lock()
+_histograms = {}   # stage -> Histogram
+_counters = {}     # (name, labels) -> value
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += seconds
+        self.count += 1
+
+class _Stage:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+def enable(on: bool = True):
+    global enabled
+    enabled = on
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+def stage(name: str):
+    """Context manager timing one stage; a no-op while metrics are disabled."""
+    return _Stage(name) if enabled else _NULL
+
+def observe(name: str, seconds: float):
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.observe(seconds)
+
+def inc(name: str, amount: float = 1, **labels):
+    if not enabled:
+        return
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+def _fmt_labels(labels) -> str:
+    if not labels:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels) + "}"
+
+def render_prometheus(extra_gauges=None, extra_counters=None) -> str:
+    """Prometheus text exposition of everything recorded so far.
+
+    `extra_gauges` / `extra_counters` map (name, labels) to values kept
+    elsewhere (e.g. cache statistics); counter names should end in `_total`.
+    """
+    lines = []
+    with _lock:
+        if _histograms:
+            lines += ["# HELP pw_stage_seconds Latency of each validation stage.",
+                      "# TYPE pw_stage_seconds histogram"]
+            for name, hist in sorted(_histograms.items()):
+                cumulative = 0
+                for bound, n in zip(hist.buckets, hist.counts):
+                    cumulative += n
+                    lines.append(f'pw_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'pw_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {hist.count}')
+                lines.append(f'pw_stage_seconds_sum{{stage="{name}"}} {hist.sum:.9f}')
+                lines.append(f'pw_stage_seconds_count{{stage="{name}"}} {hist.count}')
+        seen = set()
+        for (name, labels), value in sorted(_counters.items()):
+            if name not in seen:
+                lines.append(f"# TYPE {name} counter")
+                seen.add(name)
+            lines.append(f"{name}{_fmt_labels(labels)} {value}")
+    for kind, series in (("counter", extra_counters or {}), ("gauge", extra_gauges or {})):
+        for (name, labels), value in sorted(series.items()):
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{_fmt_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+def summary() -> str:
+    """Human-readable per-stage timing table plus counters (for CLI --timings)."""
+    with _lock:
+        rows = [f"{'stage':<16} {'count':>7} {'total ms':>10} {'mean ms':>9}"]
+        for name, hist in sorted(_histograms.items()):
+            rows.append(f"{name:<16} {hist.count:>7} {hist.sum * 1000:>10.3f} {hist.sum * 1000 / max(hist.count, 1):>9.3f}")
+        for (name, labels), value in sorted(_counters.items()):
+            rows.append(f"{name}{_fmt_labels(labels)} {value:g}")
+    return "\n".join(rows)
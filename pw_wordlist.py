@@ -0,0 +1,786 @@
+#!/usr/bin/env python3
+"""
+Wordlist storage backends and offline tools for PW Enforcer.
+
+Compiled wordlists (.pwwl) are sorted, deduplicated, length-bucketed binary
+indexes. They are mmapped read-only, so loading is near-instant and the pages
+are shared between processes through the OS page cache.
+
+Bloom filters (.pwbf) trade exactness for size: a configurable false-positive
+rate in exchange for a few bits per entry, for lists far too large to hold as
+a Python set.
+
+Usage:
+  python pw_wordlist.py compile-wordlist wordlists/rockyou_combined.txt rockyou.pwwl
+  python pw_wordlist.py build-bloom rockyou.txt rockyou.pwbf --fp-rate 0.001
+  python pw_wordlist.py merge a.txt b.txt.gz -o combined.txt
+"""
+import io, os, re, sys, math, time, heapq, mmap, struct, bisect, hashlib, argparse, logging, tempfile, threading
+from collections import OrderedDict
+
+from pw_core import (iter_wordlist, load_wordlist, as_matcher, DictionaryMatcher, DEFAULT_MAX_WORDLIST_LINES,
+                     DEFAULT_MIN_DICT_LEN, WORDLIST_READ_BUFFER, _COMPRESSION_MAGIC)
+import pw_metrics as _metrics
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent compiles are redundant but still safe
+    fcntl = None
+
+log = logging.getLogger("pw_wordlist")
+
+# File layout (little-endian):
+#   header  : magic(8) | bucket count (u32) | word count (u32)
+#   buckets : (word length u32, word count u32, data offset u64) per bucket
+#   data    : per bucket, `count` fixed-width records of `length` bytes, sorted
+COMPILED_MAGIC = b"PWWL\x01\x00\x00\x00"
+_HEADER = struct.Struct("<8sII")
+_BUCKET = struct.Struct("<IIQ")
+ENCODING = "latin-1"
+
+# Bloom filter layout (little-endian):
+#   header  : magic(8) | bit count (u64) | hash count (u32) | entry count (u64) | length count (u32)
+#   lengths : u32 per distinct word length (lets substring checks skip impossible windows)
+#   data    : bit array
+BLOOM_MAGIC = b"PWBF\x01\x00\x00\x00"
+_BLOOM_HEADER = struct.Struct("<8sQIQI")
+DEFAULT_BLOOM_FP_RATE = 0.001
+
+def _read_magic(path: str) -> bytes:
+    try:
+        with open(path, "rb") as fh:
+            return fh.read(8)
+    except OSError:
+        return b""
+
+def open_wordlist_index(path: str):
+    """Open a compiled wordlist or Bloom filter file; None for anything else."""
+    magic = _read_magic(path)
+    if magic == COMPILED_MAGIC:
+        return CompiledWordlist(path)
+    if magic == BLOOM_MAGIC:
+        return BloomFilter.load(path)
+    return None
+
+class _Bucket:
+    """Sorted fixed-width records viewed in place; usable with bisect."""
+    __slots__ = ("mm", "size", "count", "offset")
+
+    def __init__(self, mm, size, count, offset):
+        self.mm, self.size, self.count, self.offset = mm, size, count, offset
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        start = self.offset + i * self.size
+        return self.mm[start:start + self.size]
+
+    def __contains__(self, key: bytes):
+        i = bisect.bisect_left(self, key)
+        return i < self.count and self[i] == key
+
+class CompiledWordlist:
+    """Read-only, mmapped wordlist supporting `in`, len() and iteration."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, nbuckets, self._count = _HEADER.unpack_from(self._mm, 0)
+        if magic != COMPILED_MAGIC:
+            raise ValueError(f"{path}: not a compiled wordlist")
+        self._buckets = {}
+        for i in range(nbuckets):
+            size, count, offset = _BUCKET.unpack_from(self._mm, _HEADER.size + i * _BUCKET.size)
+            self._buckets[size] = _Bucket(self._mm, size, count, offset)
+        self.lengths = sorted(self._buckets)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, word):
+        bucket = self._buckets.get(len(word))
+        if bucket is None:
+            return False
+        try:
+            key = word.encode(ENCODING)
+        except UnicodeEncodeError:
+            return False
+        return key in bucket
+
+    def __iter__(self):
+        for size in self.lengths:
+            bucket = self._buckets[size]
+            for i in range(bucket.count):
+                yield bucket[i].decode(ENCODING)
+
+    def close(self):
+        self._mm.close()
+
+def write_compiled_wordlist(words, dest: str) -> int:
+    """Write an iterable of normalized words to `dest`; returns the entry count."""
+    buckets = {}
+    for w in words:
+        try:
+            key = w.encode(ENCODING)
+        except UnicodeEncodeError:
+            continue
+        buckets.setdefault(len(key), set()).add(key)
+    sizes = sorted(buckets)
+    offset = _HEADER.size + len(sizes) * _BUCKET.size
+    table, total = [], 0
+    for size in sizes:
+        table.append(_BUCKET.pack(size, len(buckets[size]), offset))
+        offset += size * len(buckets[size])
+        total += len(buckets[size])
+    tmp = f"{dest}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as out:
+        out.write(_HEADER.pack(COMPILED_MAGIC, len(sizes), total))
+        out.write(b"".join(table))
+        for size in sizes:
+            out.write(b"".join(sorted(buckets[size])))
+    os.replace(tmp, dest)
+    return total
+
+def compile_wordlist(src: str, dest: str, max_lines: int = 0) -> int:
+    return write_compiled_wordlist(iter_wordlist(src, max_lines), dest)
+
+# Shared wordlists: every worker process maps the same compiled file, so the
+# words live once in the OS page cache instead of once per process.
+SHARED_CACHE_DIR = os.path.join(tempfile.gettempdir(), "pw-enforcer")
+
+def shared_wordlist(path: str, max_lines: int = DEFAULT_MAX_WORDLIST_LINES, cache_dir: str = None):
+    """Open `path` as a read-only mmapped wordlist shared by all processes on the host.
+
+    Compiled lists and Bloom filters are mapped directly. Text (or compressed)
+    lists are compiled once into `cache_dir`, keyed by path, size, mtime and
+    max_lines; concurrent callers wait on a lock file for the first compile,
+    and compiles of older versions of the same list are removed.
+    """
+    index = open_wordlist_index(path)
+    if index is not None:
+        return index
+    st = os.stat(path)
+    cache_dir = cache_dir or SHARED_CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    source = hashlib.blake2b(os.path.realpath(path).encode(), digest_size=8).hexdigest()
+    version = hashlib.blake2b(repr((st.st_size, st.st_mtime_ns, max_lines)).encode(), digest_size=8).hexdigest()
+    dest = os.path.join(cache_dir, f"{source}-{version}.pwwl")
+    if not os.path.isfile(dest):
+        with open(os.path.join(cache_dir, source + ".lock"), "a") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            if not os.path.isfile(dest):
+                with _metrics.stage("wordlist_compile"):
+                    total = compile_wordlist(path, dest, max_lines)
+                log.info("Compiled %s entries of %s into shared %s", f"{total:,}", path, dest)
+                for name in os.listdir(cache_dir):
+                    if name.startswith(source + "-") and name.endswith(".pwwl") and name != os.path.basename(dest):
+                        try:
+                            os.unlink(os.path.join(cache_dir, name))  # mapped copies stay readable
+                        except OSError:
+                            pass
+    return CompiledWordlist(dest)
+
+class BloomFilter:
+    """Probabilistic wordlist: no false negatives, `fp_rate` false positives.
+
+    Every probe may be a false positive, so substring checks (one probe per
+    password window) raise the effective rate; prefer exact-only matching with
+    very large filters.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float = DEFAULT_BLOOM_FP_RATE):
+        capacity = max(1, capacity)
+        self.nbits = max(8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+        self.nhashes = max(1, round(self.nbits / capacity * math.log(2)))
+        self.bits = bytearray((self.nbits + 7) // 8)
+        self.count = 0
+        self.lengths = []
+        self._lengths = set()
+
+    @classmethod
+    def load(cls, path: str):
+        """mmap a persisted filter read-only; pages are shared between processes."""
+        bf = cls.__new__(cls)
+        with open(path, "rb") as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, bf.nbits, bf.nhashes, bf.count, nlengths = _BLOOM_HEADER.unpack_from(mm, 0)
+        if magic != BLOOM_MAGIC:
+            raise ValueError(f"{path}: not a Bloom filter wordlist")
+        offset = _BLOOM_HEADER.size
+        bf._lengths = set(struct.unpack_from(f"<{nlengths}I", mm, offset))
+        bf.lengths = sorted(bf._lengths)
+        offset += 4 * nlengths
+        bf.bits = memoryview(mm)[offset:offset + (bf.nbits + 7) // 8]
+        return bf
+
+    def _positions(self, word: str):
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.nhashes):
+            yield (h1 + i * h2) % self.nbits
+
+    def add(self, word: str):
+        """Set the word's bits; `count` only grows when a bit was new, so duplicates are not counted."""
+        bits, new = self.bits, False
+        for pos in self._positions(word):
+            mask = 1 << (pos & 7)
+            if not bits[pos >> 3] & mask:
+                bits[pos >> 3] |= mask
+                new = True
+        self.count += new
+        if len(word) not in self._lengths:
+            self._lengths.add(len(word))
+            self.lengths = sorted(self._lengths)
+
+    def __contains__(self, word):
+        if len(word) not in self._lengths:
+            return False
+        bits = self.bits
+        return all(bits[pos >> 3] >> (pos & 7) & 1 for pos in self._positions(word))
+
+    def __len__(self):
+        return self.count
+
+    def save(self, dest: str):
+        tmp = dest + ".tmp"
+        with open(tmp, "wb") as out:
+            out.write(_BLOOM_HEADER.pack(BLOOM_MAGIC, self.nbits, self.nhashes, self.count, len(self.lengths)))
+            out.write(struct.pack(f"<{len(self.lengths)}I", *self.lengths))
+            out.write(self.bits)
+        os.replace(tmp, dest)
+
+def build_bloom(srcs, dest: str, fp_rate: float = DEFAULT_BLOOM_FP_RATE,
+                max_lines: int = DEFAULT_MAX_WORDLIST_LINES) -> BloomFilter:
+    """Stream wordlists into a Bloom filter saved at `dest` (two passes, constant memory)."""
+    capacity = sum(1 for src in srcs for _ in iter_wordlist(src, max_lines))
+    bf = BloomFilter(capacity, fp_rate)
+    for src in srcs:
+        for w in iter_wordlist(src, max_lines):
+            bf.add(w)
+    bf.save(dest)
+    return bf
+
+# External merge sort: entries held in memory per sorted run, and runs merged at once
+MERGE_RUN_SIZE = 1_000_000
+MERGE_FAN_IN = 64
+
+def _write_run(words, tmpdir: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmpdir)
+    with os.fdopen(fd, "w", encoding=ENCODING, newline="\n") as out:
+        out.writelines(w + "\n" for w in sorted(set(words)))
+    return path
+
+def _read_run(path: str):
+    with open(path, "r", encoding=ENCODING, newline="\n") as fh:
+        for line in fh:
+            yield line[:-1]
+
+def _merge_runs(paths, out, stats=None):
+    """k-way merge of sorted runs into `out`, dropping duplicates."""
+    prev = None
+    for w in heapq.merge(*(_read_run(p) for p in paths)):
+        if w == prev:
+            continue
+        out.write(w + "\n")
+        prev = w
+        if stats is not None:
+            stats["unique"] += 1
+
+def merge_wordlists(srcs, dest: str, min_len: int = DEFAULT_MIN_DICT_LEN, max_lines: int = 0,
+                    run_size: int = MERGE_RUN_SIZE, tmpdir: str = None) -> dict:
+    """Merge wordlists into one sorted, deduplicated list with bounded memory.
+
+    Entries are normalized like load_wordlist (stripped, lowercased, gzip/xz/zstd
+    read transparently) and those shorter than `min_len` are dropped. Sorted
+    runs of `run_size` entries are spilled to temporary files and k-way merged,
+    so inputs far larger than RAM can be processed.
+    """
+    stats = {"inputs": len(srcs), "read": 0, "short": 0, "unique": 0, "duplicates": 0, "runs": 0}
+    with tempfile.TemporaryDirectory(prefix="pw_merge_", dir=tmpdir) as work:
+        runs, buf = [], []
+        for src in srcs:
+            for w in iter_wordlist(src, max_lines):
+                stats["read"] += 1
+                if len(w) < min_len:
+                    stats["short"] += 1
+                    continue
+                buf.append(w)
+                if len(buf) >= run_size:
+                    runs.append(_write_run(buf, work))
+                    buf = []
+        if buf or not runs:
+            runs.append(_write_run(buf, work))
+        stats["runs"] = len(runs)
+        # Keep the number of simultaneously open runs bounded
+        while len(runs) > MERGE_FAN_IN:
+            merged = []
+            for i in range(0, len(runs), MERGE_FAN_IN):
+                fd, path = tempfile.mkstemp(suffix=".run", dir=work)
+                with os.fdopen(fd, "w", encoding=ENCODING, newline="\n") as out:
+                    _merge_runs(runs[i:i + MERGE_FAN_IN], out)
+                for p in runs[i:i + MERGE_FAN_IN]:
+                    os.remove(p)
+                merged.append(path)
+            runs = merged
+        tmp = dest + ".tmp"
+        with open(tmp, "w", encoding=ENCODING, newline="\n") as out:
+            _merge_runs(runs, out, stats)
+        os.replace(tmp, dest)
+    stats["duplicates"] = stats["read"] - stats["short"] - stats["unique"]
+    return stats
+
+def estimate_wordset_bytes(wordset) -> int:
+    """Approximate heap footprint of a loaded wordlist (mmapped data excluded)."""
+    words = getattr(wordset, "words", wordset)
+    if isinstance(words, (set, frozenset)):
+        return sys.getsizeof(words) + sum(map(sys.getsizeof, words))
+    return sys.getsizeof(words)
+
+class _Flight:
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = self.error = None
+
+class WordlistCache:
+    """Thread-safe LRU cache of loaded wordlists with an entry and byte budget.
+
+    Entries are keyed by (realpath, mtime, size, max_lines), so an edited file
+    is reloaded. Concurrent misses on one key share a single load.
+    """
+
+    def __init__(self, max_entries: int = 8, max_bytes: int = 512 * 1024 * 1024, loader=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._loader = loader or (lambda path, max_lines: as_matcher(load_wordlist(path, max_lines)))
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (wordset, nbytes)
+        self._inflight = {}
+        self.bytes = 0
+        self.hits = self.misses = self.coalesced = self.evictions = 0
+
+    @staticmethod
+    def cache_key(path: str, max_lines: int):
+        st = os.stat(path)
+        return (os.path.realpath(path), st.st_mtime_ns, st.st_size, max_lines)
+
+    def get(self, path: str, max_lines: int = DEFAULT_MAX_WORDLIST_LINES):
+        """Cached wordset for `path`; raises OSError if the file is missing or unreadable."""
+        key = self.cache_key(path, max_lines)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return hit[0]
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = self._loader(path, max_lines)
+            self.put(key, flight.value)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.event.set()
+
+    def put(self, key, wordset):
+        nbytes = estimate_wordset_bytes(wordset)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (wordset, nbytes)
+            self.bytes += nbytes
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                _, (_, freed) = self._entries.popitem(last=False)
+                self.bytes -= freed
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced,
+                    "evictions": self.evictions, "entries": len(self._entries),
+                    "bytes": self.bytes, "max_entries": self.max_entries, "max_bytes": self.max_bytes}
+
+def _lock_shared(path: str):
+    """Read fd holding a shared flock on `path`, or None if the file is gone."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        return None
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_SH)
+        # An evicting process may have unlinked it between our open and lock
+        try:
+            same = os.path.samestat(os.fstat(fd), os.stat(path))
+        except FileNotFoundError:
+            same = False
+        if not same:
+            os.close(fd)
+            return None
+    return fd
+
+class UploadStore:
+    """Content-addressed store for uploaded wordlists, capped at `max_bytes`.
+
+    Uploads are streamed to disk in chunks while being hashed, then stored as
+    `<root>/<sha256>`. Identical content under any filename maps to the same
+    path, so a re-upload costs one hash pass and WordlistCache entries keyed on
+    it are reused. Least recently uploaded files are evicted past the byte cap,
+    except those pinned by requests still using them. A pin is a shared flock
+    on the file, so stores in other processes sharing `root` skip it too.
+    """
+    CHUNK = 1 << 20
+    _NAME = re.compile(r"^[0-9a-f]{64}$")
+
+    def __init__(self, root: str, max_bytes: int = 1024 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._pins = {}   # path -> [requests using it, fd holding the shared lock]
+        os.makedirs(root, exist_ok=True)
+
+    def save(self, stream) -> str:
+        """Store a binary stream and return its path, pinned until release(path)."""
+        digest = hashlib.sha256()
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    chunk = stream.read(self.CHUNK)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    out.write(chunk)
+            path = os.path.join(self.root, digest.hexdigest())
+            with self._lock:
+                pin = self._pins.get(path)
+                if pin:
+                    pin[0] += 1
+                else:
+                    fd = _lock_shared(path)
+                    if fd is None:
+                        # New content, or evicted by another process meanwhile: publish ours locked
+                        fd = _lock_shared(tmp)
+                        os.replace(tmp, path)
+                    self._pins[path] = [1, fd]
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                    # Recency for eviction lives in atime; mtime stays put so cache keys stay valid
+                    os.utime(path, ns=(time.time_ns(), os.stat(path).st_mtime_ns))
+                self._evict()
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return path
+
+    def release(self, path: str):
+        with self._lock:
+            pin = self._pins.get(path)
+            if pin:
+                pin[0] -= 1
+                if pin[0] <= 0:
+                    del self._pins[path]
+                    os.close(pin[1])
+
+    def _files(self):
+        """(atime, size, path) of every stored upload."""
+        files = []
+        for name in os.listdir(self.root):
+            if self._NAME.match(name):
+                path = os.path.join(self.root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_atime, st.st_size, path))
+        return files
+
+    def _evict(self):
+        files = self._files()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if path in self._pins:
+                continue
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                if fcntl:
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue  # pinned by another process
+                os.unlink(path)
+                total -= size
+                _metrics.inc("pw_upload_evictions_total")
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+
+    def usage(self) -> dict:
+        files = self._files()
+        return {"files": len(files), "bytes": sum(size for _, size, _ in files), "max_bytes": self.max_bytes}
+
+class _Snapshot:
+    """What the watcher last loaded: enough to recognise an append-only change."""
+    __slots__ = ("stat", "size", "digest", "lines", "newline_end", "plain")
+
+    def __init__(self, stat, size, digest, lines, newline_end, plain):
+        self.stat, self.size, self.digest = stat, size, digest
+        self.lines, self.newline_end, self.plain = lines, newline_end, plain
+
+def _stat_key(st):
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _hash_prefix(fh, size: int):
+    """blake2b over the first `size` bytes of fh, plus their newline count and last byte."""
+    digest = hashlib.blake2b(digest_size=16)
+    fh.seek(0)
+    lines, last, left = 0, b"", size
+    while left > 0:
+        chunk = fh.read(min(WORDLIST_READ_BUFFER, left))
+        if not chunk:
+            break
+        digest.update(chunk)
+        lines += chunk.count(b"\n")
+        last, left = chunk[-1:], left - len(chunk)
+    return digest, lines, last
+
+class OverlayMatcher(DictionaryMatcher):
+    """A DictionaryMatcher plus the words appended since it was built.
+
+    The base set is shared, never copied, so an append costs a copy of the
+    (small) overlay. Once the overlay outgrows 1/8 of the base, it is merged
+    into a new base, which keeps the amortized cost per appended word constant.
+    """
+    def __init__(self, base: DictionaryMatcher, extra):
+        self.base = base
+        self.extra = frozenset(extra)
+        self.lengths = sorted(set(base.lengths).union(map(len, self.extra)))
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def __contains__(self, word):
+        return word in self.base or word in self.extra
+
+    def __iter__(self):
+        yield from self.base
+        yield from self.extra
+
+def _with_words(wordset: DictionaryMatcher, added) -> DictionaryMatcher:
+    """A new matcher for `wordset` plus `added`; the old one is left untouched for in-flight requests."""
+    if isinstance(wordset, OverlayMatcher):
+        base, extra = wordset.base, set(wordset.extra)
+    else:
+        base, extra = wordset, set()
+    extra.update(w for w in added if w not in base)
+    if len(extra) > len(base) // 8:
+        return DictionaryMatcher(set(base).union(extra))
+    return OverlayMatcher(base, extra)
+
+class WordlistWatcher:
+    """Polls a wordlist and swaps in a rebuilt wordset when it changes.
+
+    The new wordset is built on the watcher thread and handed to `on_change`,
+    which replaces the reference callers read from. Requests already holding
+    the old wordset keep using it until they finish. When a plain-text list has
+    only been appended to (the old bytes hash the same and ended on a newline),
+    only the new lines are parsed and layered over the current set (see
+    OverlayMatcher); anything else (edits, truncation, compressed, compiled or
+    Bloom files) triggers a full reload.
+    """
+    def __init__(self, path: str, max_lines: int = DEFAULT_MAX_WORDLIST_LINES, interval: float = 5.0,
+                 on_change=None, loader=None):
+        self.path = path
+        self.max_lines = max_lines
+        self.interval = interval
+        self.on_change = on_change
+        self._loader = loader or (lambda path, max_lines: as_matcher(load_wordlist(path, max_lines)))
+        self.wordset = None
+        self.reloads = self.appends = self.errors = 0
+        self._snap = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _snapshot(self, st):
+        with open(self.path, "rb") as fh:
+            head = fh.read(8)
+            plain = open_wordlist_index(self.path) is None and not any(head.startswith(m) for m, _ in _COMPRESSION_MAGIC)
+            digest, lines, last = _hash_prefix(fh, st.st_size) if plain else (None, 0, b"")
+        newline_end = last in (b"", b"\n")
+        return _Snapshot(_stat_key(st), st.st_size, digest, lines + (not newline_end), newline_end, plain)
+
+    def load(self):
+        """Full (re)load; returns the new wordset."""
+        st = os.stat(self.path)
+        wordset = self._loader(self.path, self.max_lines)
+        self._snap = self._snapshot(st)
+        self.wordset = wordset
+        return wordset
+
+    def _append(self, st):
+        """Apply an append-only change; False if the old content was modified."""
+        old = self._snap
+        if not (old.plain and old.newline_end and st.st_size >= old.size):
+            return False
+        if not isinstance(self.wordset, DictionaryMatcher):
+            return False   # e.g. a shared mmapped list: recompile rather than copy it into this process
+        with open(self.path, "rb") as fh:
+            digest, _, _ = _hash_prefix(fh, old.size)
+            if digest.digest() != old.digest.digest():
+                return False
+            fh.seek(old.size)
+            tail = fh.read(st.st_size - old.size)
+        digest.update(tail)
+        added, lines = [], old.lines
+        with io.TextIOWrapper(io.BytesIO(tail), encoding=ENCODING, errors="ignore") as text:
+            for line in text:
+                if self.max_lines and lines >= self.max_lines:
+                    break
+                lines += 1
+                w = line.strip().lower()
+                if w:
+                    added.append(w)
+        if any(w not in self.wordset for w in added):
+            self.wordset = _with_words(self.wordset, added)
+        self._snap = _Snapshot(_stat_key(st), st.st_size, digest, lines,
+                               not tail or tail.endswith(b"\n"), True)
+        return True
+
+    def poll(self) -> bool:
+        """Check the file once; True if a new wordset was swapped in."""
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False   # mid-rename or deleted: keep serving the current list
+        if self._snap is not None and _stat_key(st) == self._snap.stat:
+            return False
+        before = self.wordset
+        try:
+            mode = "append" if self._snap is not None and self._append(st) else "full"
+            if mode == "full":
+                self.load()
+        except Exception as e:
+            self.errors += 1
+            log.exception("Reloading wordlist %s failed; keeping the current one: %s", self.path, e)
+            return False
+        if self.wordset is before:
+            return False
+        if mode == "append":
+            self.appends += 1
+        else:
+            self.reloads += 1
+        _metrics.inc("pw_wordlist_reloads_total", mode=mode)
+        log.info("Wordlist %s reloaded: %s entries", self.path, f"{len(self.wordset):,}")
+        if self.on_change:
+            self.on_change(self.wordset)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def start(self):
+        if self._snap is None:
+            self.load()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="pw-wordlist-watch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="PW Enforcer wordlist tools")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    cp = sub.add_parser("compile-wordlist", help="Compile a text wordlist into an mmappable .pwwl index")
+    cp.add_argument("src", help="Source wordlist (one term per line)")
+    cp.add_argument("dest", help="Output path (e.g. wordlists/rockyou.pwwl)")
+    cp.add_argument("--max-lines", "-m", type=int, default=0, help="Max lines to read from the source (0 = all)")
+
+    bp = sub.add_parser("build-bloom", help="Build a compact Bloom filter (.pwbf) from one or more wordlists")
+    bp.add_argument("src", nargs="+", help="Source wordlists")
+    bp.add_argument("dest", help="Output path (e.g. wordlists/rockyou.pwbf)")
+    bp.add_argument("--fp-rate", type=float, default=DEFAULT_BLOOM_FP_RATE, help="Target false-positive rate per lookup")
+    bp.add_argument("--max-lines", "-m", type=int, default=0, help="Max lines to read per source (0 = all)")
+
+    mp = sub.add_parser("merge", help="Merge, normalize and dedupe wordlists with a bounded-memory external sort")
+    mp.add_argument("src", nargs="+", help="Source wordlists (plain or compressed)")
+    mp.add_argument("--output", "-o", required=True, help="Sorted, deduplicated output list")
+    mp.add_argument("--min-dict-len", type=int, default=DEFAULT_MIN_DICT_LEN, help="Drop entries shorter than this")
+    mp.add_argument("--max-lines", "-m", type=int, default=0, help="Max lines to read per source (0 = all)")
+    mp.add_argument("--run-size", type=int, default=MERGE_RUN_SIZE, help="Entries sorted in memory per run")
+    mp.add_argument("--tmpdir", help="Directory for temporary sorted runs (default: system temp)")
+
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "compile-wordlist":
+        if not os.path.isfile(args.src):
+            ap.error(f"wordlist not found: {args.src}")
+        total = compile_wordlist(args.src, args.dest, args.max_lines)
+        log.info("Compiled %s unique entries into %s", f"{total:,}", args.dest)
+    elif args.command == "build-bloom":
+        missing = [p for p in args.src if not os.path.isfile(p)]
+        if missing:
+            ap.error(f"wordlist not found: {', '.join(missing)}")
+        if not 0 < args.fp_rate < 1:
+            ap.error("--fp-rate must be between 0 and 1")
+        bf = build_bloom(args.src, args.dest, args.fp_rate, args.max_lines)
+        log.info("Built Bloom filter of %s entries (%s KiB, %d hashes) into %s",
+                 f"{bf.count:,}", f"{len(bf.bits) // 1024:,}", bf.nhashes, args.dest)
+    elif args.command == "merge":
+        missing = [p for p in args.src if not os.path.isfile(p)]
+        if missing:
+            ap.error(f"wordlist not found: {', '.join(missing)}")
+        stats = merge_wordlists(args.src, args.output, args.min_dict_len, args.max_lines,
+                                max(1, args.run_size), args.tmpdir)
+        log.info("Merged %d input(s) into %s: %s read, %s too short, %s duplicates, %s unique (%d run(s))",
+                 stats["inputs"], args.output, f"{stats['read']:,}", f"{stats['short']:,}",
+                 f"{stats['duplicates']:,}", f"{stats['unique']:,}", stats["runs"])
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())